@@ -0,0 +1,124 @@
+import argparse
+import gc
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence
+
+import homework
+from messages import RenderResult
+
+BENCHMARK_RECORDS = 100_000
+BENCHMARK_INVALID_SHARE = 0.01
+BENCHMARK_REPEAT = 5
+
+
+def make_records(count: int, invalid_share: float = BENCHMARK_INVALID_SHARE,
+                 seed: int = 0) -> List[Dict[str, Any]]:
+    """Случайные описания работ; доля invalid_share из них некорректна."""
+    rng = random.Random(seed)
+    statuses = list(homework.HOMEWORK_STATUSES)
+    records = []
+    for index in range(count):
+        record = {
+            'homework_name': f'hw{index}', 'status': rng.choice(statuses)
+        }
+        if rng.random() < invalid_share:
+            record[rng.choice(['status', 'homework_name'])] = None
+            if rng.random() < 0.5:
+                record['status'] = 'unknown'
+        records.append(record)
+    return records
+
+
+def parse_each(homeworks: Sequence[Dict[str, Any]]) -> RenderResult:
+    """Поэлементный вызов parse_status, как в исходном цикле опроса."""
+    messages = []
+    errors = []
+    for index, homework_ in enumerate(homeworks):
+        try:
+            messages.append(homework.parse_status(homework_))
+        except Exception as error:
+            messages.append(None)
+            errors.append((index, error))
+    return messages, errors
+
+
+@dataclass
+class BenchmarkResult:
+    """Лучшее время обработки записей каждым способом."""
+
+    records: int
+    errors: int
+    per_item: float
+    batch: float
+    matches: bool
+
+    @property
+    def speedup(self) -> float:
+        """Во сколько раз пакетная обработка быстрее поэлементной."""
+        return self.per_item / self.batch
+
+    def report(self) -> str:
+        """Текстовый отчёт."""
+        return '\n'.join([
+            f'Записей: {self.records}, некорректных: {self.errors}',
+            f'parse_status по одной: {self.per_item * 1000:.1f} мс',
+            f'parse_statuses пакетом: {self.batch * 1000:.1f} мс',
+            f'Ускорение: {self.speedup:.2f}x',
+            'Результаты совпадают' if self.matches
+            else 'Результаты различаются!',
+        ])
+
+
+def best_time(function: Callable[[Any], RenderResult], records: Any,
+              repeat: int) -> float:
+    """Лучшее из repeat измерений времени function(records).
+    Как и timeit, на время измерений отключает сборщик мусора.
+    """
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function(records)
+            timings.append(time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def benchmark(count: int = BENCHMARK_RECORDS,
+              invalid_share: float = BENCHMARK_INVALID_SHARE,
+              repeat: int = BENCHMARK_REPEAT) -> BenchmarkResult:
+    """Сравнивает parse_status и parse_statuses на count записях."""
+    records = make_records(count, invalid_share)
+    expected, expected_errors = parse_each(records)
+    messages, errors = homework.parse_statuses(records)
+    return BenchmarkResult(
+        records=count,
+        errors=len(errors),
+        per_item=best_time(parse_each, records, repeat),
+        batch=best_time(homework.parse_statuses, records, repeat),
+        matches=messages == expected and [
+            (index, type(error)) for index, error in errors
+        ] == [(index, type(error)) for index, error in expected_errors],
+    )
+
+
+def main() -> None:
+    """Запуск сравнения из командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Сравнение parse_status и parse_statuses.'
+    )
+    parser.add_argument('--records', type=int, default=BENCHMARK_RECORDS)
+    parser.add_argument('--invalid-share', type=float,
+                        default=BENCHMARK_INVALID_SHARE,
+                        help='доля некорректных записей')
+    parser.add_argument('--repeat', type=int, default=BENCHMARK_REPEAT)
+    args = parser.parse_args()
+    print(benchmark(args.records, args.invalid_share, args.repeat).report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from exceptions import ConfigError
+from messages import DEFAULT_LOCALE, MESSAGE_TEMPLATES
+from notifiers import build_notifier
+
+MAX_RETRY_TIME = 7 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class TenantConfig:
+    """Настройки одного получателя уведомлений."""
+
+    name: str
+    practicum_token: str
+    telegram_token: str
+    chat_id: str
+    status_board: bool = False
+    board_final_messages: bool = False
+    locale: str = DEFAULT_LOCALE
+
+
+@dataclass(frozen=True)
+class Config:
+    """Настройки бота, которые можно менять без перезапуска."""
+
+    retry_time: int
+    homework_statuses: Dict[str, str] = field(hash=False)
+    tenants: Tuple[TenantConfig, ...]
+    subscriptions: Dict[str, Tuple[str, ...]] = field(
+        default_factory=dict, hash=False
+    )
+    notifiers: Dict[str, Tuple[Dict[str, Any], ...]] = field(
+        default_factory=dict, hash=False
+    )
+    verdicts: Dict[str, Dict[str, str]] = field(
+        default_factory=dict, hash=False
+    )
+
+    def subscribers(self, tenant: TenantConfig) -> Tuple[str, ...]:
+        """Чаты, в которые доставляются уведомления получателя tenant."""
+        chat_ids = (tenant.chat_id,) + self.subscriptions.get(tenant.name, ())
+        return tuple(dict.fromkeys(chat_ids))
+
+
+def load_config(path: Optional[str], defaults: Config) -> Config:
+    """Загружает и проверяет конфигурацию из json-файла.
+    Отсутствующие в файле ключи берутся из defaults. Без файла
+    проверяется и возвращается defaults. При любой ошибке чтения
+    или проверки выбрасывается ConfigError.
+    """
+    if path is None:
+        data = {}
+    else:
+        try:
+            with open(path, encoding='utf-8') as config_file:
+                data = json.load(config_file)
+        except (OSError, ValueError) as error:
+            raise ConfigError(f'Ошибка чтения конфигурации {path}: {error}')
+    if not isinstance(data, dict):
+        raise ConfigError('Конфигурация должна быть словарём.')
+    tenants = data.get('tenants')
+    tenants = defaults.tenants if tenants is None else _tenants(tenants)
+    return Config(
+        retry_time=_retry_time(data.get('retry_time', defaults.retry_time)),
+        homework_statuses=_homework_statuses(
+            data.get('homework_statuses', defaults.homework_statuses)
+        ),
+        tenants=tenants,
+        subscriptions=_subscriptions(
+            data.get('subscriptions', defaults.subscriptions), tenants
+        ),
+        notifiers=_notifiers(
+            data.get('notifiers', defaults.notifiers), tenants
+        ),
+        verdicts=_verdicts(data.get('verdicts', defaults.verdicts)),
+    )
+
+
+def _retry_time(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise ConfigError('retry_time должен быть положительным целым.')
+    if value > MAX_RETRY_TIME:
+        raise ConfigError(
+            f'retry_time должен быть не больше {MAX_RETRY_TIME} секунд.'
+        )
+    return value
+
+
+def _homework_statuses(value: Any) -> Dict[str, str]:
+    if not isinstance(value, dict) or not value:
+        raise ConfigError('homework_statuses должен быть непустым словарём.')
+    for status, verdict in value.items():
+        if not isinstance(verdict, str) or not verdict:
+            raise ConfigError(f'Пустой вердикт для статуса {status}.')
+    return dict(value)
+
+
+def _verdicts(value: Any) -> Dict[str, Dict[str, str]]:
+    if not isinstance(value, dict):
+        raise ConfigError('verdicts должен быть словарём.')
+    verdicts = {}
+    for locale, locale_verdicts in value.items():
+        if locale not in MESSAGE_TEMPLATES:
+            raise ConfigError(f'Вердикты для неизвестной локали {locale}.')
+        if not isinstance(locale_verdicts, dict):
+            raise ConfigError(f'Вердикты локали {locale} - не словарь.')
+        verdicts[locale] = _homework_statuses(locale_verdicts)
+    return verdicts
+
+
+def _tenants(value: Any) -> Tuple[TenantConfig, ...]:
+    if not isinstance(value, list) or not value:
+        raise ConfigError('tenants должен быть непустым списком.')
+    tenants = []
+    names = set()
+    for item in value:
+        if not isinstance(item, dict):
+            raise ConfigError('Описание получателя должно быть словарём.')
+        tenant = TenantConfig(**{
+            key: _required(item, key) for key in (
+                'name', 'practicum_token', 'telegram_token', 'chat_id'
+            )
+        }, **{
+            key: _flag(item, key)
+            for key in ('status_board', 'board_final_messages')
+        }, locale=_locale(item))
+        if tenant.name in names:
+            raise ConfigError(f'Повторяется получатель {tenant.name}.')
+        names.add(tenant.name)
+        tenants.append(tenant)
+    return tuple(tenants)
+
+
+def _subscriptions(value: Any, tenants: Tuple[TenantConfig, ...]
+                   ) -> Dict[str, Tuple[str, ...]]:
+    if not isinstance(value, dict):
+        raise ConfigError('subscriptions должен быть словарём.')
+    names = {tenant.name for tenant in tenants}
+    subscriptions = {}
+    for name, chat_ids in value.items():
+        if name not in names:
+            raise ConfigError(f'Подписка на неизвестного получателя {name}.')
+        if not isinstance(chat_ids, (list, tuple)) or not all(
+            isinstance(chat_id, (str, int))
+            and not isinstance(chat_id, bool) and str(chat_id)
+            for chat_id in chat_ids
+        ):
+            raise ConfigError(f'Некорректный список чатов для {name}.')
+        subscriptions[name] = tuple(str(chat_id) for chat_id in chat_ids)
+    return subscriptions
+
+
+def _notifiers(value: Any, tenants: Tuple[TenantConfig, ...]
+               ) -> Dict[str, Tuple[Dict[str, Any], ...]]:
+    if not isinstance(value, dict):
+        raise ConfigError('notifiers должен быть словарём.')
+    names = {tenant.name for tenant in tenants}
+    notifiers = {}
+    for name, specs in value.items():
+        if name not in names:
+            raise ConfigError(f'Каналы для неизвестного получателя {name}.')
+        if not isinstance(specs, (list, tuple)):
+            raise ConfigError(f'Некорректный список каналов для {name}.')
+        for index, spec in enumerate(specs):
+            try:
+                build_notifier(spec)
+            except (TypeError, KeyError, ValueError) as error:
+                raise ConfigError(_notifier_error(name, index, spec, error))
+        notifiers[name] = tuple(dict(spec) for spec in specs)
+    return notifiers
+
+
+def _notifier_error(name: str, index: int, spec: Any,
+                    error: Exception) -> str:
+    """Описание ошибки канала без значений из spec.
+    В spec бывают пароли и токены, а ошибки конфигурации логируются
+    и пересылаются в Telegram, поэтому значения в текст не попадают:
+    у TypeError и KeyError в тексте только имена ключей.
+    """
+    kind = spec.get('type') if isinstance(spec, dict) else None
+    reason = type(error).__name__
+    if isinstance(error, (TypeError, KeyError)):
+        reason = f'{reason}: {error}'
+    return f'Некорректный канал №{index} ({kind}) для {name}: {reason}'
+
+
+def _required(item: Dict[str, Any], key: str) -> str:
+    value = item.get(key)
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise ConfigError(f'У получателя отсутствует ключ {key}.')
+    value = str(value)
+    if not value:
+        raise ConfigError(f'У получателя пустой ключ {key}.')
+    return value
+
+
+def _flag(item: Dict[str, Any], key: str) -> bool:
+    value = item.get(key, False)
+    if not isinstance(value, bool):
+        raise ConfigError(f'Ключ {key} получателя должен быть true/false.')
+    return value
+
+
+def _locale(item: Dict[str, Any]) -> str:
+    value = item.get('locale', DEFAULT_LOCALE)
+    if value not in MESSAGE_TEMPLATES:
+        raise ConfigError(
+            f'Неизвестная локаль {value}, доступны: '
+            f'{", ".join(MESSAGE_TEMPLATES)}.'
+        )
+    return value
@@ -0,0 +1,200 @@
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import partial
+from http import HTTPStatus
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import requests
+import telegram as tg
+from telegram.error import BadRequest, InvalidToken, Unauthorized
+
+from config import TenantConfig
+from delivery import FanOut
+from exceptions import (InvalidCredentialsError, StatusAPIResponseError,
+                        ThrottledAPIError)
+from metrics import metrics
+from ratelimit import RateLimiter, parse_retry_after
+
+CREDENTIALS_TTL = 3600
+CREDENTIALS_RETRY = 300
+CREDENTIALS_WORKERS = 32
+CREDENTIALS_TIMEOUT = 10
+CREDENTIALS_RATE = 1.0
+CREDENTIALS_BURST = 5
+CREDENTIALS_MAX_IN_FLIGHT = 2
+
+
+def probe_practicum(endpoint: str, token: str,
+                    timeout: float = CREDENTIALS_TIMEOUT,
+                    limiter: Optional[RateLimiter] = None,
+                    throttle: Optional[Callable[[float], None]] = None
+                    ) -> None:
+    """Проверяет токен Практикума запросом к эндпоинту endpoint.
+    Отклонённый токен - InvalidCredentialsError, прочие сбои -
+    другие исключения. С limiter запрос ждёт разрешения своего
+    ограничителя без ограничения времени; ответ 429 приостанавливает
+    limiter и передаётся в throttle (ограничитель опроса).
+    """
+    with limiter.acquire(None) if limiter else nullcontext():
+        response = requests.get(
+            endpoint, headers={'Authorization': f'OAuth {token}'},
+            params={'from_date': int(time.time())}, timeout=timeout
+        )
+        if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            retry_after = parse_retry_after(
+                response.headers.get('Retry-After')
+            )
+            if throttle is not None:
+                throttle(retry_after)
+            raise ThrottledAPIError(
+                'API Практикума ограничил запросы проверки токена',
+                retry_after
+            )
+    if response.status_code in (HTTPStatus.UNAUTHORIZED,
+                                HTTPStatus.FORBIDDEN):
+        raise InvalidCredentialsError(
+            f'API Практикума отклонил токен: код {response.status_code}'
+        )
+    if response.status_code != HTTPStatus.OK:
+        raise StatusAPIResponseError(
+            f'Код ответа API Практикума {response.status_code}'
+        )
+
+
+def probe_telegram(token: str, chat_id: str,
+                   timeout: float = CREDENTIALS_TIMEOUT,
+                   bot_factory: Callable[[str], tg.Bot] = tg.Bot) -> None:
+    """Проверяет токен бота и доступ бота к чату chat_id.
+    Отклонённые данные - InvalidCredentialsError, прочие сбои -
+    другие исключения.
+    """
+    try:
+        bot_factory(token).get_chat(chat_id, timeout=timeout)
+    except (InvalidToken, Unauthorized) as error:
+        raise InvalidCredentialsError(f'Telegram отклонил токен бота: {error}')
+    except BadRequest as error:
+        raise InvalidCredentialsError(
+            f'Чат {chat_id} недоступен боту: {error}'
+        )
+
+
+@dataclass
+class CredentialCheck:
+    """Итог проверки учётных данных получателя."""
+
+    tenant: TenantConfig
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Данные подтверждены обоими API."""
+        return self.error is None
+
+    @property
+    def invalid(self) -> bool:
+        """Данные отклонены; сбой самой проверки отказом не считается."""
+        return isinstance(self.error, InvalidCredentialsError)
+
+    @property
+    def unverified(self) -> bool:
+        """Проверка не состоялась: сеть, ответы 5xx или 429."""
+        return not self.ok and not self.invalid
+
+
+class CredentialValidator:
+    """Параллельная проверка учётных данных получателей.
+    Каждый токен Практикума и каждая пара (токен бота, чат) проверяются
+    один раз, одновременно выполняется не больше workers проверок.
+    Итоги, в том числе отказы, кэшируются на ttl секунд; сбои проверки
+    (сеть, ответы 5xx) не кэшируются и повторяются через retry секунд.
+    """
+
+    def __init__(self, practicum: Callable[[str, float], None],
+                 telegram: Callable[[str, str, float], None],
+                 workers: int = CREDENTIALS_WORKERS,
+                 ttl: float = CREDENTIALS_TTL,
+                 timeout: float = CREDENTIALS_TIMEOUT,
+                 monotonic: Callable[[], float] = time.monotonic,
+                 retry: float = CREDENTIALS_RETRY):
+        """Init."""
+        self.practicum = practicum
+        self.telegram = telegram
+        self.workers = workers
+        self.ttl = ttl
+        self.retry = retry
+        self.timeout = timeout
+        self.monotonic = monotonic
+        self.cache: Dict[Hashable, Tuple[float, Optional[BaseException]]] = {}
+        self.probes = 0
+
+    def _probes(self, tenant: TenantConfig
+                ) -> Dict[Hashable, Callable[[], None]]:
+        return {
+            ('practicum', tenant.practicum_token): partial(
+                self.practicum, tenant.practicum_token, self.timeout
+            ),
+            ('telegram', tenant.telegram_token, tenant.chat_id): partial(
+                self.telegram, tenant.telegram_token, tenant.chat_id,
+                self.timeout
+            ),
+        }
+
+    def validate(self, tenants: Iterable[TenantConfig]
+                 ) -> Dict[str, CredentialCheck]:
+        """Проверяет получателей tenants; итоги по именам получателей."""
+        tenants = list(tenants)
+        now = self.monotonic()
+        self.cache = {
+            key: cached for key, cached in self.cache.items()
+            if cached[0] > now
+        }
+        errors = {}
+        pending = {}
+        for tenant in tenants:
+            for key, probe in self._probes(tenant).items():
+                if key in self.cache:
+                    errors[key] = self.cache[key][1]
+                    metrics.inc('credentials_cache_hits_total')
+                else:
+                    pending[key] = probe
+        errors.update(self._run(pending))
+        return {
+            tenant.name: CredentialCheck(tenant, _verdict([
+                errors[key] for key in self._probes(tenant)
+            ]))
+            for tenant in tenants
+        }
+
+    def _run(self, pending: Dict[Hashable, Callable[[], None]]
+             ) -> Dict[Hashable, Optional[BaseException]]:
+        if not pending:
+            return {}
+        pool = FanOut(min(self.workers, len(pending)), 'credentials')
+        try:
+            futures = [
+                (key, pool.submit(lambda key: pending[key](), key))
+                for key in pending
+            ]
+            errors = {}
+            for key, future in futures:
+                error = errors[key] = future.result().error
+                self.probes += 1
+                metrics.inc('credentials_probes_total')
+                if error is None or isinstance(error,
+                                               InvalidCredentialsError):
+                    self.cache[key] = (self.monotonic() + self.ttl, error)
+            return errors
+        finally:
+            pool.shutdown()
+
+
+def _verdict(errors: Iterable[Optional[BaseException]]
+             ) -> Optional[BaseException]:
+    """Главная ошибка проверки: отказ важнее сбоя."""
+    errors = [error for error in errors if error is not None]
+    invalid = [
+        error for error in errors
+        if isinstance(error, InvalidCredentialsError)
+    ]
+    return (invalid or errors or [None])[0]
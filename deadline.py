@@ -0,0 +1,136 @@
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional, TypeVar
+
+from exceptions import DeadlineExceededError
+
+CYCLE_BUDGET = 60
+HEDGE_WORKERS = 8
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+HEDGE_PERCENTILE = 0.95
+
+T = TypeVar('T')
+
+
+class Deadline:
+    """Бюджет времени цикла опроса по монотонным часам."""
+
+    def __init__(self, budget: float,
+                 monotonic: Callable[[], float] = time.monotonic):
+        """Init."""
+        self.monotonic = monotonic
+        self.expires = monotonic() + budget
+
+    def remaining(self) -> float:
+        """Оставшееся время в секундах."""
+        return max(0.0, self.expires - self.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Исчерпан ли бюджет."""
+        return self.remaining() <= 0
+
+    def timeout(self, limit: Optional[float] = None) -> float:
+        """Таймаут операции: остаток бюджета, но не больше limit.
+        Если бюджет исчерпан, выбрасывает DeadlineExceededError.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError('Бюджет времени цикла исчерпан.')
+        return remaining if limit is None else min(limit, remaining)
+
+
+class Hedger:
+    """Хеджирование запросов.
+    Если ответ не пришёл за задержку хеджа (заданную или p95 недавних
+    задержек), отправляется второй такой же запрос и берётся ответ,
+    пришедший первым. Доля хеджей ограничена ratio от числа запросов,
+    поэтому нагрузка на API не удваивается.
+    """
+
+    def __init__(self, ratio: float = 0.0, delay: Optional[float] = None,
+                 workers: int = HEDGE_WORKERS, window: int = HEDGE_WINDOW,
+                 min_samples: int = HEDGE_MIN_SAMPLES):
+        """Init."""
+        self.ratio = ratio
+        self.delay = delay
+        self.min_samples = min_samples
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.lock = threading.Lock()
+        self.executor = None
+        if ratio > 0:
+            self.executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='hedge'
+            )
+
+    def hedge_delay(self) -> Optional[float]:
+        """Задержка перед отправкой хеджа или None, если хеджировать рано."""
+        if self.delay is not None:
+            return self.delay
+        with self.lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[math.ceil(len(ordered) * HEDGE_PERCENTILE) - 1]
+
+    def call(self, request: Callable[[float], T], deadline: Deadline) -> T:
+        """Выполняет request(timeout) в пределах бюджета deadline."""
+        with self.lock:
+            self.requests += 1
+        delay = self.hedge_delay()
+        if self.executor is None or delay is None:
+            return self._timed(request, deadline)
+        primary = self.executor.submit(self._timed, request, deadline)
+        done, _ = wait([primary], timeout=min(delay, deadline.remaining()))
+        if done or not self._take_hedge():
+            return self._result([primary], deadline)
+        hedge = self.executor.submit(self._timed, request, deadline)
+        return self._result([primary, hedge], deadline)
+
+    def _take_hedge(self) -> bool:
+        with self.lock:
+            if self.hedges + 1 > self.ratio * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def _result(self, futures: list, deadline: Deadline) -> T:
+        pending = list(futures)
+        error = None
+        while pending:
+            done, _ = wait(
+                pending, timeout=deadline.remaining(),
+                return_when=FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for future in done:
+                pending.remove(future)
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        with self.lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        if error is not None:
+            raise error
+        raise DeadlineExceededError('Бюджет времени цикла исчерпан.')
+
+    def _timed(self, request: Callable[[float], T], deadline: Deadline) -> T:
+        started = time.monotonic()
+        result = request(deadline.timeout())
+        with self.lock:
+            self.latencies.append(time.monotonic() - started)
+        return result
+
+    def shutdown(self) -> None:
+        """Останавливает пул хеджирующих запросов."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import (Any, Callable, Deque, Dict, Hashable, Iterable, List,
+                    Optional, Tuple)
+
+DELIVERY_WORKERS = 8
+DELIVERY_TIMEOUT = 30
+
+_Job = Tuple[Callable[[Any], None], Any, Future]
+
+
+@dataclass
+class Delivery:
+    """Итог доставки одному адресату."""
+
+    target: Any
+    elapsed: float
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Доставлено ли сообщение."""
+        return self.error is None
+
+
+class FanOut:
+    """Параллельная доставка нескольким адресатам.
+    Отправки выполняются в ограниченном пуле потоков. У каждого адресата
+    своя очередь: его отправки выполняются по порядку и по одной, поэтому
+    медленный адресат занимает не больше одного потока и не задерживает
+    остальных. Очереди обслуживаются по кругу: после каждой отправки
+    поток уступается другим очередям.
+    """
+
+    def __init__(self, workers: int = DELIVERY_WORKERS,
+                 name: str = 'delivery'):
+        """Init."""
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=name
+        )
+        self.lock = threading.Lock()
+        self.lanes: Dict[Hashable, Deque[_Job]] = {}
+
+    def submit(self, send: Callable[[Any], None], target: Any) -> Future:
+        """Запускает send(target) в пуле; результат future - Delivery."""
+        return self.executor.submit(self._timed, send, target)
+
+    def enqueue(self, lane: Hashable, send: Callable[[Any], None],
+                target: Any) -> Future:
+        """Ставит send(target) в очередь lane.
+        Возвращает future с итогом (Delivery), не дожидаясь отправки.
+        """
+        result = Future()
+        with self.lock:
+            queue = self.lanes.get(lane)
+            start = queue is None
+            if start:
+                queue = self.lanes[lane] = deque()
+            queue.append((send, target, result))
+        if start:
+            self._schedule(lane)
+        return result
+
+    def deliver(self, targets: Iterable[Any],
+                send: Callable[[Any], None]) -> List[Future]:
+        """Ставит send(target) в очередь каждого адресата.
+        send должен сам ограничивать время отправки. Возвращает futures
+        с итогами в порядке адресатов.
+        """
+        return [self.enqueue(target, send, target) for target in targets]
+
+    def shutdown(self) -> None:
+        """Останавливает пул, не дожидаясь зависших отправок.
+        Отправки, которые ещё ждут в очередях, отменяются.
+        """
+        with self.lock:
+            for queue in self.lanes.values():
+                for _, _, result in queue:
+                    result.cancel()
+            self.lanes.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule(self, lane: Hashable) -> None:
+        try:
+            self.executor.submit(self._run, lane)
+        except RuntimeError:
+            with self.lock:
+                self.lanes.pop(lane, None)
+
+    def _run(self, lane: Hashable) -> None:
+        """Выполняет первую отправку очереди lane."""
+        with self.lock:
+            queue = self.lanes.get(lane)
+            if not queue:
+                self.lanes.pop(lane, None)
+                return
+            send, target, result = queue.popleft()
+        if result.set_running_or_notify_cancel():
+            result.set_result(self._timed(send, target))
+        with self.lock:
+            queue = self.lanes.get(lane)
+            if queue is None:
+                return
+            if not queue:
+                del self.lanes[lane]
+                return
+        self._schedule(lane)
+
+    @staticmethod
+    def _timed(send: Callable[[Any], None], target: Any) -> Delivery:
+        started = time.monotonic()
+        try:
+            send(target)
+        except Exception as error:
+            return Delivery(target, time.monotonic() - started, error)
+        return Delivery(target, time.monotonic() - started)
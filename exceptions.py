@@ -26,3 +26,30 @@ class UnknownHomeworkStatusError(Exception):
     """Недокументированный статус проверки работы."""
 
     pass
+
+
+class ConfigError(Exception):
+    """Некорректная конфигурация."""
+
+    pass
+
+
+class DeadlineExceededError(Exception):
+    """Исчерпан бюджет времени цикла опроса."""
+
+    pass
+
+
+class ThrottledAPIError(Exception):
+    """Запросы к API ограничены: ответ 429 или локальный лимит."""
+
+    def __init__(self, message: str, retry_after: float = 0):
+        """Init."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InvalidCredentialsError(Exception):
+    """Учётные данные получателя отклонены API."""
+
+    pass
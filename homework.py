@@ -1,22 +1,58 @@
+import argparse
 import logging
 import os
+import signal
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from http import HTTPStatus
-from typing import Any, Dict, Union
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Sequence,
+                    Set, Tuple, Union)
 
 import requests
 import telegram as tg
 from dotenv import load_dotenv
 
-from exceptions import (EmptyAPIResponseError, GetAPIRequestError,
-                        JSONAPIResponseError, StatusAPIResponseError,
+from config import Config, TenantConfig, load_config
+from credentials import (CREDENTIALS_BURST, CREDENTIALS_MAX_IN_FLIGHT,
+                         CREDENTIALS_RATE, CREDENTIALS_RETRY, CredentialCheck,
+                         CredentialValidator, probe_practicum, probe_telegram)
+from credentials import CREDENTIALS_TTL as DEFAULT_CREDENTIALS_TTL
+from credentials import CREDENTIALS_WORKERS as DEFAULT_CREDENTIALS_WORKERS
+from deadline import CYCLE_BUDGET as DEFAULT_CYCLE_BUDGET
+from deadline import Deadline, Hedger
+from delivery import DELIVERY_WORKERS as DEFAULT_DELIVERY_WORKERS
+from delivery import Delivery
+from exceptions import (ConfigError, DeadlineExceededError,
+                        EmptyAPIResponseError,
+                        GetAPIRequestError, JSONAPIResponseError,
+                        StatusAPIResponseError, ThrottledAPIError,
                         UnknownHomeworkStatusError)
+from messages import DEFAULT_LOCALE, MessageRenderer, RenderResult
+from metrics import metrics
+from notifiers import Dispatcher, Notifier, TelegramNotifier, build_notifier
+from profiling import PROFILE_DIR, CycleProfiler
+from ratelimit import API_BURST as DEFAULT_API_BURST
+from ratelimit import API_MAX_IN_FLIGHT as DEFAULT_API_MAX_IN_FLIGHT
+from ratelimit import API_RATE as DEFAULT_API_RATE
+from ratelimit import RateLimiter, parse_retry_after
+from scheduler import SCHEDULER_RESOLUTION, PollScheduler
+from singleflight import COALESCE_TTL as DEFAULT_COALESCE_TTL
+from singleflight import SingleFlight
+from statusboard import BOARD_DEBOUNCE as DEFAULT_BOARD_DEBOUNCE
+from statusboard import FINAL_STATUSES, BoardStore, StatusBoard
 
 load_dotenv()
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+CONFIG_FILE = os.getenv('CONFIG_FILE')
+DELIVERY_WORKERS = int(os.getenv('DELIVERY_WORKERS', DEFAULT_DELIVERY_WORKERS))
+PROFILE_CYCLES = int(os.getenv('PROFILE_CYCLES', 0))
+PROFILE_SIGNAL_CYCLES = int(os.getenv('PROFILE_SIGNAL_CYCLES', 10))
 
 EXC_INFO = False
 logger = logging.getLogger(__name__)
@@ -28,6 +64,23 @@ handler.setFormatter(logging.Formatter(
 logger.addHandler(handler)
 
 RETRY_TIME = 600
+API_TIMEOUT = 30
+CYCLE_BUDGET = float(os.getenv('CYCLE_BUDGET', DEFAULT_CYCLE_BUDGET))
+HEDGE_RATIO = float(os.getenv('HEDGE_RATIO', 0))
+HEDGE_DELAY = float(os.getenv('HEDGE_DELAY', 0)) or None
+API_RATE = float(os.getenv('API_RATE', DEFAULT_API_RATE))
+API_BURST = int(os.getenv('API_BURST', DEFAULT_API_BURST))
+API_MAX_IN_FLIGHT = int(
+    os.getenv('API_MAX_IN_FLIGHT', DEFAULT_API_MAX_IN_FLIGHT)
+)
+METRICS_FILE = os.getenv('METRICS_FILE')
+COALESCE_TTL = float(os.getenv('COALESCE_TTL', DEFAULT_COALESCE_TTL))
+BOARD_DEBOUNCE = float(os.getenv('BOARD_DEBOUNCE', DEFAULT_BOARD_DEBOUNCE))
+BOARD_STATE_FILE = os.getenv('BOARD_STATE_FILE')
+CREDENTIALS_TTL = float(os.getenv('CREDENTIALS_TTL', DEFAULT_CREDENTIALS_TTL))
+CREDENTIALS_WORKERS = int(
+    os.getenv('CREDENTIALS_WORKERS', DEFAULT_CREDENTIALS_WORKERS)
+)
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
@@ -39,6 +92,14 @@ HOMEWORK_STATUSES = {
 }
 
 
+LOCALE_VERDICTS: Dict[str, Dict[str, str]] = {}
+
+
+renderer: Optional[MessageRenderer] = None
+
+Channels = Tuple[List[Notifier], List[Notifier], Dict[str, StatusBoard]]
+
+
 class BotHandler(logging.StreamHandler):
     """Handler для отправки лога в ТГ чат."""
 
@@ -69,18 +130,39 @@ class NoRepeatFilter(logging.Filter):
         return allow
 
 
+class Tenant:
+    """Получатель уведомлений и состояние его опроса."""
+
+    def __init__(self, config: TenantConfig, bot: tg.Bot,
+                 current_timestamp: int):
+        """Init."""
+        self.config = config
+        self.bot = bot
+        self.headers = {'Authorization': f'OAuth {config.practicum_token}'}
+        self.current_timestamp = current_timestamp
+        self.notifiers = [TelegramNotifier(bot, config.chat_id)]
+        self.final_notifiers = self.notifiers
+        self.boards: Dict[str, StatusBoard] = {}
+        self.retry = deque()
+
+
 def send_message(bot: tg.Bot, message: str) -> None:
     """Отправляет сообщение в Telegram чат.
     Telegram чат, определяется переменной окружения TELEGRAM_CHAT_ID.
     Принимает на вход два параметра:
     экземпляр класса Bot и строку с текстом сообщения.
     """
+    send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_to_chat(bot: tg.Bot, chat_id: str, message: str) -> None:
+    """Отправляет сообщение в Telegram чат chat_id."""
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
+        bot.send_message(chat_id=chat_id, text=message)
     except Exception as error:
         logger.error(
             'Ошибка отправки сообщения в чат %s: %s',
-            TELEGRAM_CHAT_ID,
+            chat_id,
             error,
             exc_info=EXC_INFO
         )
@@ -88,12 +170,75 @@ def send_message(bot: tg.Bot, message: str) -> None:
         logger.info(
             'Сообщение "%s" отправлено в чат %s',
             message,
-            TELEGRAM_CHAT_ID
+            chat_id
+        )
+
+
+def deliver(dispatcher: Dispatcher, tenant: Tenant, message: str,
+            deadline: Optional[Deadline] = None,
+            notifiers: Optional[List[Notifier]] = None) -> List[Future]:
+    """Ставит сообщение в очереди всех каналов получателя.
+    Доставка не ожидается. Каналы - чаты подписчиков, вебхуки и почта;
+    notifiers заменяет их. Итог по каждому каналу логируется по
+    завершении.
+    Возвращает futures с итогами доставки (Delivery).
+    """
+    if notifiers is None:
+        notifiers = tenant.notifiers
+    return dispatcher.dispatch(
+        notifiers, message, deadline, partial(log_delivery, tenant, message)
+    )
+
+
+def flush_board(board: StatusBoard, deadline: Deadline,
+                notifier: Notifier) -> None:
+    """Обновляет закреплённое сообщение board в потоке пула доставки.
+    Таймаут ограничен остатком бюджета deadline на момент начала.
+    """
+    if board.flush(deadline.timeout(notifier.timeout)):
+        logger.info(
+            'Закреплённое сообщение в чате %s обновлено', board.chat_id
+        )
+
+
+def log_delivery(tenant: Tenant, message: str, result: Delivery) -> None:
+    """Логирует итог доставки сообщения по одному каналу.
+    Доставка, не начатая до конца бюджета цикла, возвращается в очередь
+    повторов получателя tenant.
+    """
+    if isinstance(result.error, DeadlineExceededError):
+        tenant.retry.append((result.target, message))
+        logger.warning(
+            'Доставка сообщения "%s" (%s) отложена до следующего опроса',
+            message,
+            result.target
+        )
+    elif result.ok:
+        logger.info(
+            'Сообщение "%s" доставлено: %s за %.2f с',
+            message,
+            result.target,
+            result.elapsed
+        )
+    else:
+        logger.error(
+            'Ошибка доставки сообщения: %s: %s',
+            result.target,
+            result.error,
+            exc_info=EXC_INFO
         )
 
 
 def get_api_answer(current_timestamp) -> Dict[str, Any]:
     """Делает запрос к эндпоинту API-сервиса."""
+    return request_api_answer(current_timestamp, HEADERS)
+
+
+def request_api_answer(current_timestamp, headers: Dict[str, str],
+                       timeout: float = API_TIMEOUT) -> Dict[str, Any]:
+    """Делает запрос к эндпоинту API-сервиса с заголовками headers.
+    Запрос ожидает ответа не дольше timeout секунд.
+    """
     timestamp = current_timestamp or int(time.time())
     params = {'from_date': timestamp}
     logger.info(
@@ -101,12 +246,19 @@ def get_api_answer(current_timestamp) -> Dict[str, Any]:
     )
     try:
         homework_statuses = requests.get(
-            ENDPOINT, headers=HEADERS, params=params
+            ENDPOINT, headers=headers, params=params, timeout=timeout
         )
     except Exception as error:
         message = (f'Ошибка запроса к API: Эндпоинт {ENDPOINT}; '
                    f'Исключение {error}')
         raise GetAPIRequestError(message)
+    if homework_statuses.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        retry_after = parse_retry_after(
+            homework_statuses.headers.get('Retry-After')
+        )
+        message = (f'Ошибка запроса к API: Эндпоинт {ENDPOINT}; '
+                   f'Слишком много запросов, повтор через {retry_after} с')
+        raise ThrottledAPIError(message, retry_after)
     if homework_statuses.status_code != HTTPStatus.OK:
         message = (f'Ошибка запроса к API: Эндпоинт {ENDPOINT}; '
                    f'Код ответа {homework_statuses.status_code}')
@@ -156,6 +308,28 @@ def parse_status(homework: Dict[str, Union[str, int]]) -> str:
     return f'Изменился статус проверки работы "{homework_name}". {verdict}'
 
 
+def message_renderer() -> MessageRenderer:
+    """Шаблоны сообщений для текущих HOMEWORK_STATUSES и LOCALE_VERDICTS.
+    Кэш шаблонов сбрасывается, когда один из словарей заменяется.
+    """
+    global renderer
+    if (renderer is None or renderer.statuses is not HOMEWORK_STATUSES
+            or renderer.verdicts is not LOCALE_VERDICTS):
+        renderer = MessageRenderer(
+            HOMEWORK_STATUSES, verdicts=LOCALE_VERDICTS
+        )
+    return renderer
+
+
+def parse_statuses(homeworks: Sequence[Dict[str, Union[str, int]]],
+                   locale: str = DEFAULT_LOCALE) -> RenderResult:
+    """Пакетный вариант parse_status для списка работ.
+    Не выбрасывает исключений: возвращает сообщения в порядке работ
+    (None для некорректных записей) и список пар (индекс, ошибка).
+    """
+    return message_renderer().render(homeworks, locale)
+
+
 def check_tokens() -> bool:
     """Проверяет доступность переменных окружения.
     Если отсутствует хотя бы одна переменная окружения -
@@ -164,43 +338,762 @@ def check_tokens() -> bool:
     return all([PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID])
 
 
-def main() -> None:
-    """Основная логика работы бота."""
-    if not check_tokens():
-        message = ('Отсутствует обязательная переменная окружения. '
-                   'Программа принудительно остановлена.')
-        logger.critical(message)
-        sys.exit(message)
+def parse_args() -> argparse.Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Telegram-бот для API сервиса Практикум.Домашка.'
+    )
+    parser.add_argument(
+        '--config', default=CONFIG_FILE,
+        help='json-файл конфигурации, перечитывается по SIGHUP'
+    )
+    parser.add_argument(
+        '--check-credentials', action='store_true',
+        help='проверить учётные данные всех получателей и завершиться'
+    )
+    parser.add_argument(
+        '--profile', type=int, default=PROFILE_CYCLES, metavar='N',
+        help='профилировать первые N циклов опроса'
+    )
+    parser.add_argument(
+        '--profile-dir', default=os.getenv('PROFILE_DIR', PROFILE_DIR),
+        help='каталог для отчётов профилирования'
+    )
+    return parser.parse_args()
 
-    bot = tg.Bot(token=TELEGRAM_TOKEN)
 
-    bot_handler = BotHandler(send_message, bot)
-    bot_handler.setFormatter(logging.Formatter(
-        '%(asctime)s [%(levelname)s] (%(funcName)s) %(message)s'
-    ))
-    bot_handler.setLevel(logging.ERROR)
-    bot_handler.addFilter(NoRepeatFilter())
-    logger.addHandler(bot_handler)
+def default_config() -> Config:
+    """Конфигурация из переменных окружения и констант модуля."""
+    return Config(
+        retry_time=RETRY_TIME,
+        homework_statuses=dict(HOMEWORK_STATUSES),
+        tenants=(TenantConfig(
+            name='default',
+            practicum_token=PRACTICUM_TOKEN,
+            telegram_token=TELEGRAM_TOKEN,
+            chat_id=TELEGRAM_CHAT_ID,
+        ),),
+    )
+
+
+def api_limiter(clock: Any = time) -> RateLimiter:
+    """Общий ограничитель запросов к API Практикума."""
+    return RateLimiter(
+        API_RATE, API_BURST, API_MAX_IN_FLIGHT,
+        monotonic=clock.monotonic, sleep=clock.sleep
+    )
 
-    current_timestamp = int(time.time()) - RETRY_TIME
 
-    while True:
+def credential_validator(clock: Any = time,
+                         limiter: Optional[RateLimiter] = None
+                         ) -> CredentialValidator:
+    """Проверка учётных данных через API Практикума и Telegram.
+    У проверок свой ограничитель запросов к API Практикума, поэтому
+    они не расходуют лимит опроса и не отклоняются им; ответ 429
+    приостанавливает и ограничитель опроса limiter.
+    """
+    probes = RateLimiter(
+        CREDENTIALS_RATE, CREDENTIALS_BURST, CREDENTIALS_MAX_IN_FLIGHT,
+        monotonic=clock.monotonic, sleep=clock.sleep
+    )
+    return CredentialValidator(
+        partial(
+            probe_practicum, ENDPOINT, limiter=probes,
+            throttle=limiter.throttle if limiter else None
+        ),
+        probe_telegram,
+        workers=CREDENTIALS_WORKERS, ttl=CREDENTIALS_TTL,
+        monotonic=clock.monotonic, retry=CREDENTIALS_RETRY
+    )
+
+
+def board_store(config_path: Optional[str]) -> Optional[BoardStore]:
+    """Файл состояния закреплённых сообщений.
+    По умолчанию лежит рядом с файлом конфигурации; без него и без
+    BOARD_STATE_FILE состояние не сохраняется.
+    """
+    path = BOARD_STATE_FILE
+    if path is None and config_path is not None:
+        path = f'{os.path.splitext(config_path)[0]}.boards.json'
+    return BoardStore(path) if path else None
+
+
+def check_credentials(config: Config,
+                      validator: CredentialValidator) -> int:
+    """Проверяет учётные данные всех получателей config.
+    Логирует итог по каждому получателю. Возвращает число получателей,
+    чьи данные отклонены или не проверены из-за сбоя.
+    """
+    checks = validator.validate(config.tenants)
+    for name, check in checks.items():
+        if check.ok:
+            logger.info('Учётные данные получателя %s подтверждены', name)
+        else:
+            logger.warning(
+                'Учётные данные получателя %s: %s', name, check.error
+            )
+    invalid = sum(check.invalid for check in checks.values())
+    unverified = sum(check.unverified for check in checks.values())
+    logger.info(
+        'Проверено получателей: %s, отклонено: %s, не проверено: %s, '
+        'проверок: %s',
+        len(checks), invalid, unverified, validator.probes
+    )
+    return invalid + unverified
+
+
+def _current_checks(checks: Dict[str, CredentialCheck],
+                    configs: Dict[str, TenantConfig]
+                    ) -> Dict[str, CredentialCheck]:
+    """Итоги проверок получателей, чьи настройки не изменились."""
+    return {
+        name: check for name, check in checks.items()
+        if configs.get(name) == check.tenant
+    }
+
+
+class Worker:
+    """Опрос API для всех получателей с горячей перезагрузкой настроек.
+    Перезагрузка запрашивается сигналом SIGHUP или изменением файла
+    конфигурации и применяется между циклами опроса. Получатели с
+    неизменными настройками сохраняют состояние и экземпляр бота.
+    Если задан validator, получатели с отклонёнными учётными данными
+    помещаются на карантин и не опрашиваются до повторной проверки.
+    Проверки выполняются в фоновом потоке и не задерживают опрос.
+    """
+
+    def __init__(self, config: Config, config_path: Optional[str] = None,
+                 bot_factory: Callable[[str], tg.Bot] = tg.Bot,
+                 clock: Any = time,
+                 validator: Optional[CredentialValidator] = None,
+                 limiter: Optional[RateLimiter] = None):
+        """Init."""
+        self.defaults = config
+        self.config_path = config_path
+        self.bot_factory = bot_factory
+        self.clock = clock
+        self.validator = validator
+        self.quarantined: Dict[str, CredentialCheck] = {}
+        self.unverified: Dict[str, CredentialCheck] = {}
+        self.revalidate_at = None
+        self.validation: Optional[Future] = None
+        self.validation_executor = None
+        if validator is not None:
+            self.validation_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='credentials'
+            )
+        self.config = None
+        self.tenants = {}
+        self.scheduler = None
+        self.dispatcher = Dispatcher(DELIVERY_WORKERS)
+        self.hedger = Hedger(HEDGE_RATIO, HEDGE_DELAY)
+        self.single_flight = SingleFlight(COALESCE_TTL, clock.monotonic)
+        self.limiter = limiter or api_limiter(clock)
+        self.reload_requested = False
+        self.config_mtime = self._config_mtime()
+        self.board_store = board_store(config_path)
+        self.board_lock = threading.Lock()
+        self.flushing: Set[StatusBoard] = set()
+        self.board_states = self._load_boards()
+        self.apply(load_config(config_path, config))
+
+    def close(self) -> None:
+        """Останавливает пулы доставки, хеджирования и проверки токенов."""
+        self.dispatcher.shutdown()
+        self.hedger.shutdown()
+        if self.validation_executor is not None:
+            self.validation_executor.shutdown(
+                wait=False, cancel_futures=True
+            )
+
+    def install_signal(self) -> bool:
+        """Включает перезагрузку настроек по сигналу SIGHUP."""
+        signum = getattr(signal, 'SIGHUP', None)
+        if signum is None:
+            return False
+        signal.signal(signum, self.request_reload)
+        return True
+
+    def request_reload(self, signum=None, frame=None) -> None:
+        """Запрашивает перезагрузку настроек перед следующим циклом."""
+        self.reload_requested = True
+
+    def _config_mtime(self) -> Optional[float]:
+        if self.config_path is None:
+            return None
+        try:
+            return os.stat(self.config_path).st_mtime
+        except OSError:
+            return None
+
+    def reload_if_needed(self) -> None:
+        """Перезагружает настройки, если это запрошено или файл изменился.
+        Некорректная конфигурация, как и любая ошибка её применения
+        (например, неверный токен бота), отклоняется, работа
+        продолжается с прежними настройками.
+        """
+        mtime = self._config_mtime()
+        if not self.reload_requested and mtime == self.config_mtime:
+            return
+        self.reload_requested = False
+        self.config_mtime = mtime
         try:
-            response = get_api_answer(current_timestamp)
+            self.apply(load_config(self.config_path, self.defaults))
+        except Exception as error:
+            logger.error(
+                'Конфигурация отклонена, используется прежняя: %s',
+                error,
+                exc_info=EXC_INFO
+            )
+            return
+        logger.info('Конфигурация перезагружена')
+
+    def apply(self, config: Config) -> None:
+        """Применяет проверенную конфигурацию.
+        Боты, получатели и каналы уведомлений собираются отдельно и
+        подменяют действующие только после успешной сборки: при ошибке
+        работа продолжается с прежними настройками без изменений.
+        """
+        global RETRY_TIME, HOMEWORK_STATUSES, LOCALE_VERDICTS
+        timestamps = {
+            tenant.config.practicum_token: tenant.current_timestamp
+            for tenant in self.tenants.values()
+        }
+        default_timestamp = int(self.clock.time()) - config.retry_time
+        tenants = {}
+        channels = {}
+        for tenant_config in config.tenants:
+            start_timestamp = timestamps.setdefault(
+                tenant_config.practicum_token, default_timestamp
+            )
+            old = tenant = self.tenants.get(tenant_config.name)
+            if tenant is None:
+                tenant = Tenant(
+                    tenant_config,
+                    self.bot_factory(tenant_config.telegram_token),
+                    start_timestamp
+                )
+            elif tenant.config != tenant_config:
+                tenant = self._updated(tenant, tenant_config, start_timestamp)
+            channels[tenant] = self._channels(tenant, old, config)
+            tenants[tenant_config.name] = tenant
+        configs = {name: tenant.config for name, tenant in tenants.items()}
+        quarantined = _current_checks(self.quarantined, configs)
+        unverified = _current_checks(self.unverified, configs)
+        scheduled = {
+            name: tenant for name, tenant in tenants.items()
+            if name not in quarantined
+        }
+        scheduler, plan = self._plan(scheduled, config.retry_time)
+        for tenant, (notifiers, final_notifiers, boards) in channels.items():
+            tenant.notifiers = notifiers
+            tenant.final_notifiers = final_notifiers
+            tenant.boards = boards
+        self.quarantined = quarantined
+        self.unverified = unverified
+        self._reschedule(scheduler, plan, scheduled, config.retry_time)
+        self.tenants = tenants
+        self.config = config
+        RETRY_TIME = config.retry_time
+        HOMEWORK_STATUSES = config.homework_statuses
+        LOCALE_VERDICTS = config.verdicts
+        self.validate(config.tenants)
+
+    def validate(self, tenants: Iterable[TenantConfig]) -> None:
+        """Запускает фоновую проверку учётных данных получателей tenants.
+        Итог применяет revalidate_if_needed; ещё не начатая прежняя
+        проверка отменяется.
+        """
+        if self.validator is None:
+            return
+        if self.validation is not None:
+            self.validation.cancel()
+        self.validation = self.validation_executor.submit(
+            self.validator.validate, tuple(tenants)
+        )
+
+    def _quarantine(self, checks: Dict[str, CredentialCheck]) -> None:
+        """Помещает на карантин получателей с отклонёнными данными.
+        Остальных проверенных получателей снимает с карантина. Итоги
+        для уже изменённых или удалённых получателей пропускаются.
+        """
+        now = self.clock.monotonic()
+        for name, check in checks.items():
+            tenant = self.tenants.get(name)
+            if tenant is None or tenant.config != check.tenant:
+                continue
+            self.unverified.pop(name, None)
+            if check.invalid:
+                self.quarantined[name] = check
+                self.scheduler.remove(name)
+                logger.error(
+                    'Получатель %s на карантине: %s', name, check.error
+                )
+                continue
+            if check.unverified:
+                self.unverified[name] = check
+                logger.warning(
+                    'Не удалось проверить учётные данные получателя %s: %s',
+                    name,
+                    check.error
+                )
+            if self.quarantined.pop(name, None) is not None:
+                self.scheduler.add(
+                    name, now, phase_key=tenant.config.practicum_token
+                )
+        metrics.set('tenants_quarantined', len(self.quarantined))
+        metrics.set('tenants_unverified', len(self.unverified))
+        self.revalidate_at = now + (
+            self.validator.retry if self.unverified else self.validator.ttl
+        )
+
+    def revalidate_if_needed(self) -> None:
+        """Применяет итоги фоновой проверки учётных данных.
+        Получатели на карантине повторно проверяются раз в ttl проверки,
+        а получатели, чью проверку сорвал сбой, - раз в retry.
+        """
+        validation = self.validation
+        if validation is not None and validation.done():
+            self.validation = None
+            try:
+                self._quarantine(validation.result())
+            except Exception as error:
+                logger.error(
+                    'Ошибка проверки учётных данных: %s',
+                    error,
+                    exc_info=EXC_INFO
+                )
+        pending = {**self.quarantined, **self.unverified}
+        if (self.validation is None and pending
+                and self.clock.monotonic() >= self.revalidate_at):
+            self.validate(check.tenant for check in pending.values())
+
+    def _plan(self, tenants: Dict[str, Tenant], retry_time: int
+              ) -> Tuple[PollScheduler, Dict[str, float]]:
+        """Расписание и новые сроки опроса получателей tenants.
+        Действующее расписание не меняется; если срок не помещается
+        в колесо таймеров, выбрасывается ValueError.
+        """
+        now = self.clock.monotonic()
+        scheduler = self.scheduler or PollScheduler(
+            now, retry_time, resolution=SCHEDULER_RESOLUTION
+        )
+        interval_changed = scheduler.interval != retry_time
+        plan = {}
+        for name, tenant in tenants.items():
+            token = tenant.config.practicum_token
+            if (interval_changed or scheduler.when(name) is None
+                    or self.tenants[name].config.practicum_token != token):
+                plan[name] = scheduler.first_run(token, now, retry_time)
+        return scheduler, plan
+
+    def _reschedule(self, scheduler: PollScheduler, plan: Dict[str, float],
+                    tenants: Dict[str, Tenant], retry_time: int) -> None:
+        """Применяет сроки plan, получателей не из tenants снимает."""
+        now = self.clock.monotonic()
+        self.scheduler = scheduler
+        scheduler.interval = retry_time
+        for name in self.tenants:
+            if name not in tenants:
+                scheduler.remove(name)
+        for name, when in plan.items():
+            scheduler.add(name, now, when=when)
+
+    def _channels(self, tenant: Tenant, old: Optional[Tenant],
+                  config: Config) -> Channels:
+        """Каналы уведомлений и закреплённые сообщения получателя.
+        Возвращает notifiers, final_notifiers и boards, не изменяя
+        tenant. В режиме status_board чаты подписчиков получают одно
+        закреплённое сообщение со статусами; отдельные сообщения в них
+        отправляются только о финальных вердиктах и только с
+        board_final_messages. Закреплённые сообщения сохраняются при
+        перезагрузке и перезапуске, если не сменился бот.
+        """
+        chat_ids = config.subscribers(tenant.config)
+        chats = [TelegramNotifier(tenant.bot, chat_id) for chat_id in chat_ids]
+        extra = [
+            build_notifier(spec)
+            for spec in config.notifiers.get(tenant.config.name, ())
+        ]
+        if not tenant.config.status_board:
+            return chats + extra, chats + extra, {}
+        boards = {}
+        restore = old is None or old.bot is tenant.bot
+        if old is not None and restore:
+            boards = old.boards
+        boards = {
+            chat_id: boards.get(chat_id) or self._board(
+                tenant, chat_id, restore
+            )
+            for chat_id in chat_ids
+        }
+        if tenant.config.board_final_messages:
+            return extra, chats + extra, boards
+        return extra, extra, boards
+
+    def _board(self, tenant: Tenant, chat_id: str,
+               restore: bool) -> StatusBoard:
+        """Закреплённое сообщение в чате chat_id.
+        С restore продолжает сохранённое сообщение, если оно есть.
+        """
+        board = StatusBoard(
+            tenant.bot, chat_id, BOARD_DEBOUNCE, self.clock.monotonic
+        )
+        state = self.board_states.get(tenant.config.name, {}).get(chat_id)
+        if restore and state:
+            try:
+                board.restore(state)
+            except Exception as error:
+                logger.error(
+                    'Некорректное состояние закреплённого сообщения '
+                    'в чате %s: %s',
+                    chat_id,
+                    error,
+                    exc_info=EXC_INFO
+                )
+        return board
+
+    def _load_boards(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        if self.board_store is None:
+            return {}
+        try:
+            return self.board_store.load()
+        except (OSError, ValueError) as error:
+            logger.error(
+                'Ошибка чтения состояния закреплённых сообщений: %s',
+                error,
+                exc_info=EXC_INFO
+            )
+            return {}
+
+    def save_boards(self) -> None:
+        """Сохраняет состояние закреплённых сообщений всех получателей.
+        Файл перезаписывается, только если состояние изменилось.
+        Вызывается и из потоков пула доставки.
+        """
+        if self.board_store is None:
+            return
+        states = {}
+        for name, tenant in self.tenants.items():
+            boards = {
+                chat_id: board.state()
+                for chat_id, board in tenant.boards.items()
+                if board.message_id is not None
+            }
+            if boards:
+                states[name] = boards
+        with self.board_lock:
+            if states == self.board_states:
+                return
+            try:
+                self.board_store.save(states)
+            except OSError as error:
+                logger.error(
+                    'Ошибка записи состояния закреплённых сообщений в %s: %s',
+                    self.board_store.path,
+                    error,
+                    exc_info=EXC_INFO
+                )
+                return
+            self.board_states = states
+
+    def _updated(self, tenant: Tenant, config: TenantConfig,
+                 start_timestamp: int) -> Tenant:
+        old = tenant.config
+        bot = tenant.bot
+        if config.telegram_token != old.telegram_token:
+            bot = self.bot_factory(config.telegram_token)
+        if config.practicum_token == old.practicum_token:
+            start_timestamp = tenant.current_timestamp
+        updated = Tenant(config, bot, start_timestamp)
+        updated.retry = tenant.retry
+        return updated
+
+    def poll(self, tenant: Tenant) -> None:
+        """Выполняет один цикл опроса API для получателя tenant."""
+        self.poll_group([tenant])
+
+    def poll_group(self, tenants: List[Tenant]) -> None:
+        """Выполняет один цикл опроса API для группы получателей.
+        У получателей tenants общие токен Практикума и метка времени:
+        ответ API запрашивается один раз и рассылается всем. Запрос
+        к API и отправка уведомлений укладываются в бюджет CYCLE_BUDGET
+        секунд.
+        """
+        deadline = Deadline(CYCLE_BUDGET)
+        leader = tenants[0]
+
+        def request(timeout: float) -> Dict[str, Any]:
+            with self.limiter.acquire(timeout):
+                return request_api_answer(
+                    leader.current_timestamp, leader.headers,
+                    deadline.timeout(API_TIMEOUT)
+                )
+
+        for tenant in tenants:
+            self.redeliver(tenant, deadline)
+        try:
+            response = self.single_flight.do(
+                (leader.config.practicum_token, leader.current_timestamp),
+                lambda: self.hedger.call(request, deadline),
+                deadline.remaining()
+            )
+            self.single_flight.coalesce(len(tenants) - 1)
             homeworks = check_response(response)
             if not homeworks:
                 logger.info('Новые статусы отсутствуют')
-            for homework in homeworks:
-                send_message(bot, parse_status(homework))
-            current_timestamp = response['current_date']
+            for tenant in tenants:
+                self.handle(tenant, homeworks, deadline)
+                tenant.current_timestamp = response['current_date']
+        except ThrottledAPIError as error:
+            logger.warning(
+                'Опрос получателей %s отложен: %s',
+                ', '.join(tenant.config.name for tenant in tenants),
+                error
+            )
         except Exception as error:
             logger.error(
                 'Сбой в работе программы: %s',
                 error,
                 exc_info=EXC_INFO
             )
+        for tenant in tenants:
+            self.flush_boards(tenant, deadline)
+
+    def handle(self, tenant: Tenant, homeworks: List[Dict[str, Any]],
+               deadline: Deadline) -> None:
+        """Уведомляет получателя tenant о статусах работ homeworks."""
+        messages, errors = parse_statuses(homeworks, tenant.config.locale)
+        for index, error in errors:
+            logger.error(
+                'Ошибка в описании работы %s: %s',
+                index,
+                error,
+                exc_info=EXC_INFO
+            )
+        for homework, message in zip(homeworks, messages):
+            if message is not None:
+                self.notify(tenant, homework, message, deadline)
+
+    def notify(self, tenant: Tenant, homework: Dict[str, Any],
+               message: str, deadline: Deadline) -> None:
+        """Сообщает получателю tenant о новом статусе работы homework."""
+        status = homework['status']
+        for board in tenant.boards.values():
+            board.update(
+                homework['homework_name'],
+                message_renderer().verdict(status, tenant.config.locale)
+            )
+        notifiers = tenant.notifiers
+        if status in FINAL_STATUSES:
+            notifiers = tenant.final_notifiers
+        if notifiers:
+            deliver(self.dispatcher, tenant, message, deadline, notifiers)
+
+    def redeliver(self, tenant: Tenant, deadline: Deadline) -> None:
+        """Повторяет доставки, прерванные бюджетом прошлых циклов.
+        Сообщение отправляется только адресату, до которого оно не
+        дошло; адресаты, удалённые из настроек, пропускаются.
+        """
+        notifiers = {
+            notifier.key: notifier
+            for notifier in tenant.notifiers + tenant.final_notifiers
+        }
+        for _ in range(len(tenant.retry)):
+            target, message = tenant.retry.popleft()
+            notifier = notifiers.get(target.key)
+            if notifier is not None:
+                deliver(
+                    self.dispatcher, tenant, message, deadline, [notifier]
+                )
+
+    def flush_boards(self, tenant: Tenant, deadline: Deadline) -> None:
+        """Ставит обновление закреплённых сообщений tenant в очереди чатов.
+        Очередь чата общая с сообщениями в него, поэтому зависший чат
+        не задерживает другие чаты и опрос. Для сообщения, обновление
+        которого ещё не завершилось, новое не ставится; правки,
+        отложенные debounce или бюджетом цикла, отправляются при
+        следующих опросах.
+        """
+        for board in tenant.boards.values():
+            with self.board_lock:
+                if board in self.flushing or not board.pending:
+                    continue
+                self.flushing.add(board)
+            self.dispatcher.submit(
+                TelegramNotifier(board.bot, board.chat_id),
+                partial(flush_board, board, deadline),
+                partial(self._board_flushed, board)
+            )
+
+    def _board_flushed(self, board: StatusBoard, result: Delivery) -> None:
+        """Итог обновления закреплённого сообщения board."""
+        with self.board_lock:
+            self.flushing.discard(board)
+        if isinstance(result.error, DeadlineExceededError):
+            logger.warning(
+                'Обновление закреплённого сообщения в чате %s отложено: %s',
+                board.chat_id,
+                result.error
+            )
+        elif result.error is not None:
+            logger.error(
+                'Ошибка обновления закреплённого сообщения в чате %s: %s',
+                board.chat_id,
+                result.error,
+                exc_info=EXC_INFO
+            )
+        self.save_boards()
+
+    def due(self) -> List[Tenant]:
+        """Получатели, срок опроса которых наступил."""
+        return [
+            self.tenants[name]
+            for name in self.scheduler.due(self.clock.monotonic())
+            if name in self.tenants
+        ]
+
+    def next_wakeup(self) -> float:
+        """Сколько секунд ждать до следующей проверки расписания."""
+        wakeup = self.scheduler.next_wakeup()
+        if wakeup is None:
+            return RETRY_TIME
+        return min(RETRY_TIME, max(0.0, wakeup - self.clock.monotonic()))
+
+    def cycle(self, tenants: List[Tenant]) -> None:
+        """Один цикл опроса получателей tenants.
+        Получатели с общими токеном и меткой времени опрашиваются
+        одним запросом.
+        """
+        groups: Dict[Tuple[str, int], List[Tenant]] = {}
+        for tenant in tenants:
+            groups.setdefault(
+                (tenant.config.practicum_token, tenant.current_timestamp), []
+            ).append(tenant)
+        for group in groups.values():
+            self.poll_group(group)
+        if METRICS_FILE:
+            try:
+                metrics.write(METRICS_FILE)
+            except OSError as error:
+                logger.error(
+                    'Ошибка записи метрик в %s: %s',
+                    METRICS_FILE,
+                    error,
+                    exc_info=EXC_INFO
+                )
+
+
+def start_profiling(profiler: CycleProfiler) -> None:
+    """Начинает профилирование цикла, если оно запрошено.
+    Ошибка запуска профилирования отменяет сессию, но не опрос.
+    """
+    try:
+        profiler.start_cycle()
+    except Exception as error:
+        logger.error(
+            'Ошибка запуска профилирования: %s',
+            error,
+            exc_info=EXC_INFO
+        )
+
+
+def finish_profiling(profiler: CycleProfiler) -> None:
+    """Завершает профилирование цикла и сообщает о сохранённых отчётах.
+    Ошибки сохранения отчётов не прерывают опрос.
+    """
+    try:
+        reports = profiler.end_cycle()
+    except Exception as error:
+        logger.error(
+            'Ошибка сохранения отчётов профилирования: %s',
+            error,
+            exc_info=EXC_INFO
+        )
+    else:
+        if reports:
+            logger.info(
+                'Отчёты профилирования сохранены: %s', ', '.join(reports)
+            )
+
 
-        time.sleep(RETRY_TIME)
+def add_bot_handler(bot: tg.Bot) -> BotHandler:
+    """Подключает к логгеру отправку ошибок в Telegram чат."""
+    bot_handler = BotHandler(send_message, bot)
+    bot_handler.setFormatter(logging.Formatter(
+        '%(asctime)s [%(levelname)s] (%(funcName)s) %(message)s'
+    ))
+    bot_handler.setLevel(logging.ERROR)
+    bot_handler.addFilter(NoRepeatFilter())
+    logger.addHandler(bot_handler)
+    return bot_handler
+
+
+def run(worker: Worker, profiler: CycleProfiler, clock: Any = time,
+        cycles: Optional[int] = None,
+        on_cycle: Optional[Callable[[int], None]] = None) -> None:
+    """Цикл опроса API.
+    Часы clock должны предоставлять функции time(), monotonic() и sleep(),
+    как модуль time. Получатели опрашиваются по расписанию worker, между
+    сроками цикл спит. Если задано cycles, цикл завершается после
+    указанного количества циклов опроса; on_cycle вызывается с номером
+    каждого завершённого цикла.
+    """
+    cycle = 0
+    while cycles is None or cycle < cycles:
+        worker.reload_if_needed()
+        worker.revalidate_if_needed()
+        tenants = worker.due()
+        if tenants:
+            start_profiling(profiler)
+            worker.cycle(tenants)
+            finish_profiling(profiler)
+            cycle += 1
+            if on_cycle is not None:
+                on_cycle(cycle)
+        clock.sleep(worker.next_wakeup())
+
+
+def main() -> None:
+    """Основная логика работы бота."""
+    args = parse_args()
+    if args.check_credentials:
+        try:
+            config = load_config(args.config, default_config())
+        except ConfigError as error:
+            logger.critical(error)
+            sys.exit(str(error))
+        validator = credential_validator(limiter=api_limiter())
+        sys.exit(1 if check_credentials(config, validator) else 0)
+    if not check_tokens():
+        message = ('Отсутствует обязательная переменная окружения. '
+                   'Программа принудительно остановлена.')
+        logger.critical(message)
+        sys.exit(message)
+
+    bot = tg.Bot(token=TELEGRAM_TOKEN)
+    add_bot_handler(bot)
+
+    try:
+        limiter = api_limiter()
+        worker = Worker(
+            default_config(), args.config,
+            validator=credential_validator(limiter=limiter), limiter=limiter
+        )
+    except (ConfigError, tg.error.InvalidToken) as error:
+        logger.critical(error)
+        sys.exit(str(error))
+    worker.install_signal()
+
+    profiler = CycleProfiler(args.profile_dir, PROFILE_SIGNAL_CYCLES)
+    profiler.install_signal()
+    if args.profile:
+        profiler.arm(args.profile)
+
+    try:
+        run(worker, profiler)
+    finally:
+        worker.close()
 
 
 if __name__ == '__main__':
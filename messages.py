@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from exceptions import UnknownHomeworkStatusError
+
+DEFAULT_LOCALE = 'ru'
+MESSAGE_TEMPLATES = {
+    'ru': 'Изменился статус проверки работы "{homework_name}". {verdict}',
+    'en': 'Review status of homework "{homework_name}" changed. {verdict}',
+}
+VERDICTS = {
+    'en': {
+        'approved': 'The reviewer approved the homework. Hooray!',
+        'reviewing': 'The homework is being reviewed.',
+        'rejected': 'The reviewer left comments on the homework.',
+    },
+}
+
+RenderResult = Tuple[List[Optional[str]], List[Tuple[int, Exception]]]
+
+
+class MessageRenderer:
+    """Подготовка сообщений о статусах работ по шаблонам локалей.
+    Шаблон для пары (статус, локаль) собирается при первом обращении и
+    хранится в кэше (по локали, затем по статусу) как начало и конец
+    сообщения вокруг названия работы.
+    Вердикт статуса на языке локали берётся из verdicts (вердикты из
+    конфигурации), затем из встроенных VERDICTS и, наконец, из
+    statuses; статусы, которых нет в statuses, считаются
+    недокументированными.
+    """
+
+    def __init__(self, statuses: Dict[str, str],
+                 templates: Dict[str, str] = MESSAGE_TEMPLATES,
+                 verdicts: Optional[Dict[str, Dict[str, str]]] = None):
+        """Init."""
+        self.statuses = statuses
+        self.templates = templates
+        self.verdicts = verdicts
+        self.cache: Dict[str, Dict[str, Optional[Tuple[str, str]]]] = {}
+
+    def verdict(self, status: str, locale: str = DEFAULT_LOCALE
+                ) -> Optional[str]:
+        """Вердикт для статуса status на языке locale."""
+        if status not in self.statuses:
+            return None
+        for verdicts in (self.verdicts or {}, VERDICTS):
+            verdict = verdicts.get(locale, {}).get(status)
+            if verdict is not None:
+                return verdict
+        return self.statuses[status]
+
+    def _compile(self, status: str, locale: str
+                 ) -> Optional[Tuple[str, str]]:
+        verdict = self.verdict(status, locale)
+        if verdict is None:
+            return None
+        template = self.templates[locale].replace('{verdict}', verdict)
+        head, _, tail = template.partition('{homework_name}')
+        return head, tail
+
+    def render(self, homeworks: Sequence[Any],
+               locale: str = DEFAULT_LOCALE) -> RenderResult:
+        """Сообщения для списка работ homeworks.
+        Возвращает список сообщений в порядке работ (None для
+        некорректных записей) и список пар (индекс, ошибка). Ошибки
+        отдельных записей не прерывают обработку; для неизвестной
+        локали ошибка возвращается по каждой записи.
+        """
+        if locale not in self.templates:
+            return [None] * len(homeworks), [
+                (index, KeyError(f'Неизвестная локаль {locale}.'))
+                for index in range(len(homeworks))
+            ]
+        cached = self.cache.setdefault(locale, {}).get
+        messages = []
+        append = messages.append
+        errors = []
+        for homework in homeworks:
+            if type(homework) is dict:
+                name = homework.get('homework_name')
+                status = homework.get('status')
+                template = cached(status) if type(status) is str else None
+                if template and name:
+                    head, tail = template
+                    append(f'{head}{name}{tail}')
+                    continue
+            message, error = self._render_one(homework, locale)
+            if error is not None:
+                errors.append((len(messages), error))
+            append(message)
+        return messages, errors
+
+    def _render_one(self, homework: Any, locale: str
+                    ) -> Tuple[Optional[str], Optional[Exception]]:
+        """Медленный путь render(): ошибки и статусы не из кэша."""
+        if not isinstance(homework, dict):
+            return None, TypeError('Описание работы не является словарём.')
+        name = homework.get('homework_name')
+        if not name:
+            return None, KeyError('В словаре отсутствует ключ homework_name.')
+        status = homework.get('status')
+        if not status:
+            return None, KeyError('В словаре отсутствует ключ status.')
+        template = None
+        if isinstance(status, str):
+            templates = self.cache[locale]
+            if status not in templates:
+                templates[status] = self._compile(status, locale)
+            template = templates[status]
+        if template is None:
+            return None, UnknownHomeworkStatusError(
+                'Недокументированный статус проверки работы.'
+            )
+        return f'{template[0]}{name}{template[1]}', None
@@ -0,0 +1,47 @@
+import os
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class Metrics:
+    """Потокобезопасные счётчики и показатели работы бота."""
+
+    def __init__(self):
+        """Init."""
+        self.lock = threading.Lock()
+        self.values = defaultdict(float)
+
+    def inc(self, name: str, value: float = 1) -> None:
+        """Увеличивает счётчик name на value."""
+        with self.lock:
+            self.values[name] += value
+
+    def set(self, name: str, value: float) -> None:
+        """Устанавливает показатель name."""
+        with self.lock:
+            self.values[name] = value
+
+    def get(self, name: str) -> float:
+        """Текущее значение name."""
+        with self.lock:
+            return self.values.get(name, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Копия всех значений."""
+        with self.lock:
+            return dict(self.values)
+
+    def write(self, path: str) -> None:
+        """Атомарно записывает значения в текстовом формате Prometheus."""
+        lines = [
+            f'homework_bot_{name} {value:g}'
+            for name, value in sorted(self.snapshot().items())
+        ]
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as metrics_file:
+            metrics_file.write('\n'.join(lines) + '\n')
+        os.replace(temporary, path)
+
+
+metrics = Metrics()
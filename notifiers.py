@@ -0,0 +1,233 @@
+import smtplib
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from email.message import EmailMessage
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+from deadline import Deadline
+from delivery import DELIVERY_TIMEOUT, DELIVERY_WORKERS, Delivery, FanOut
+
+NOTIFIER_TIMEOUTS = {
+    'telegram': DELIVERY_TIMEOUT,
+    'webhook': 10,
+    'smtp': 30,
+}
+SMTP_SUBJECT = 'Статус проверки домашней работы'
+
+
+class Notifier(ABC):
+    """Канал доставки уведомлений."""
+
+    kind = 'notifier'
+
+    def __init__(self, timeout: Optional[float] = None):
+        """Init."""
+        self.timeout = timeout or NOTIFIER_TIMEOUTS.get(
+            self.kind, DELIVERY_TIMEOUT
+        )
+
+    @abstractmethod
+    def send(self, message: str, timeout: Optional[float] = None) -> None:
+        """Отправляет сообщение не дольше timeout секунд.
+        При ошибке выбрасывает исключение.
+        """
+
+    def __str__(self) -> str:
+        """Описание канала для логов."""
+        return self.kind
+
+    @property
+    def key(self) -> str:
+        """Адресат канала: у каждого адресата своя очередь отправок."""
+        return str(self)
+
+
+class TelegramNotifier(Notifier):
+    """Сообщение в Telegram чат."""
+
+    kind = 'telegram'
+
+    def __init__(self, bot: Any, chat_id: str,
+                 timeout: Optional[float] = None):
+        """Init."""
+        super().__init__(timeout)
+        self.bot = bot
+        self.chat_id = chat_id
+
+    def send(self, message: str, timeout: Optional[float] = None) -> None:
+        """Отправляет сообщение в чат."""
+        self.bot.send_message(
+            chat_id=self.chat_id, text=message,
+            timeout=timeout or self.timeout
+        )
+
+    def __str__(self) -> str:
+        """Описание канала для логов."""
+        return f'чат {self.chat_id}'
+
+
+class WebhookNotifier(Notifier):
+    """POST-запрос с json {"text": сообщение} на произвольный адрес."""
+
+    kind = 'webhook'
+
+    def __init__(self, url: str, headers: Optional[Dict[str, str]] = None,
+                 timeout: Optional[float] = None):
+        """Init."""
+        super().__init__(timeout)
+        self.url = url
+        self.headers = headers or {}
+
+    def send(self, message: str, timeout: Optional[float] = None) -> None:
+        """Отправляет сообщение на адрес вебхука."""
+        response = requests.post(
+            self.url, json={'text': message}, headers=self.headers,
+            timeout=timeout or self.timeout
+        )
+        response.raise_for_status()
+
+    def __str__(self) -> str:
+        """Описание канала для логов."""
+        return f'вебхук {self.url}'
+
+
+class SMTPNotifier(Notifier):
+    """Письмо через SMTP-сервер."""
+
+    kind = 'smtp'
+
+    def __init__(self, host: str, sender: str, recipients: Sequence[str],
+                 port: int = 25, username: Optional[str] = None,
+                 password: Optional[str] = None, starttls: bool = False,
+                 subject: str = SMTP_SUBJECT,
+                 timeout: Optional[float] = None):
+        """Init."""
+        super().__init__(timeout)
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = list(recipients)
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.subject = subject
+
+    def send(self, message: str, timeout: Optional[float] = None) -> None:
+        """Отправляет письмо получателям."""
+        email = EmailMessage()
+        email['Subject'] = self.subject
+        email['From'] = self.sender
+        email['To'] = ', '.join(self.recipients)
+        email.set_content(message)
+        with smtplib.SMTP(self.host, self.port,
+                          timeout=timeout or self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or '')
+            smtp.send_message(email)
+
+    def __str__(self) -> str:
+        """Описание канала для логов."""
+        return f'smtp {self.host}:{self.port}'
+
+
+NOTIFIERS = {
+    WebhookNotifier.kind: WebhookNotifier,
+    SMTPNotifier.kind: SMTPNotifier,
+}
+
+
+def build_notifier(spec: Dict[str, Any]) -> Notifier:
+    """Создаёт канал по описанию из конфигурации."""
+    options = dict(spec)
+    return NOTIFIERS[options.pop('type')](**options)
+
+
+def _send(message: str, deadline: Optional[Deadline],
+          notifier: Notifier) -> None:
+    """Отправка в потоке пула; таймаут считается в момент начала."""
+    timeout = notifier.timeout
+    if deadline is not None:
+        timeout = deadline.timeout(timeout)
+    notifier.send(message, timeout)
+
+
+def _report(done: Callable[[Delivery], None], future: Future) -> None:
+    if not future.cancelled():
+        done(future.result())
+
+
+class Dispatcher:
+    """Доставка сообщения по нескольким каналам без ожидания.
+    У каждого вида каналов свой пул потоков, поэтому медленный канал
+    (например, SMTP-сервер) не занимает потоки Telegram, а внутри пула
+    у каждого адресата своя очередь, поэтому зависший чат не задерживает
+    другие чаты. dispatch() только ставит отправки в очереди и сразу
+    возвращается, итог каждой отправки передаётся в callback по её
+    завершении.
+    """
+
+    def __init__(self, workers: int = DELIVERY_WORKERS):
+        """Init."""
+        self.workers = workers
+        self.pools = {}
+        self.settled = threading.Condition()
+        self.pending = set()
+
+    def _pool(self, kind: str) -> FanOut:
+        if kind not in self.pools:
+            self.pools[kind] = FanOut(self.workers, f'notify-{kind}')
+        return self.pools[kind]
+
+    def dispatch(self, notifiers: Iterable[Notifier], message: str,
+                 deadline: Optional[Deadline] = None,
+                 done: Optional[Callable[[Delivery], None]] = None
+                 ) -> List[Future]:
+        """Ставит отправку сообщения по всем каналам и не ждёт её.
+        Таймаут каждого канала ограничен остатком бюджета deadline на
+        момент начала отправки. done(Delivery) вызывается из потока пула
+        по завершении каждой отправки. Возвращает futures с итогами в
+        порядке каналов.
+        """
+        return [
+            self.submit(notifier, partial(_send, message, deadline), done)
+            for notifier in notifiers
+        ]
+
+    def submit(self, notifier: Notifier, send: Callable[[Notifier], None],
+               done: Optional[Callable[[Delivery], None]] = None) -> Future:
+        """Ставит send(notifier) в очередь адресата notifier и не ждёт.
+        send должен сам ограничивать время работы. done(Delivery)
+        вызывается из потока пула по завершении.
+        """
+        pool = self._pool(notifier.kind)
+        future = pool.enqueue(notifier.key, send, notifier)
+        with self.settled:
+            self.pending.add(future)
+        if done is not None:
+            future.add_done_callback(partial(_report, done))
+        future.add_done_callback(self._settled)
+        return future
+
+    def _settled(self, future: Future) -> None:
+        with self.settled:
+            self.pending.discard(future)
+            self.settled.notify_all()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Ожидает завершения начатых отправок не дольше timeout секунд.
+        Отправка считается завершённой после вызова её callback.
+        Возвращает True, если все отправки завершились.
+        """
+        with self.settled:
+            return self.settled.wait_for(lambda: not self.pending, timeout)
+
+    def shutdown(self) -> None:
+        """Останавливает пулы всех каналов."""
+        for pool in self.pools.values():
+            pool.shutdown()
@@ -0,0 +1,145 @@
+import cProfile
+import os
+import pstats
+import signal
+import time
+import tracemalloc
+from typing import List, Optional
+
+PROFILE_DIR = 'profiles'
+PROFILE_SORT = 'cumulative'
+PROFILE_LIMIT = 50
+TRACEMALLOC_FRAMES = 10
+PROFILE_SCOPE = (
+    '# cProfile охватывает только основной поток опроса: отправки\n'
+    '# в пулах доставки и хеджирующие запросы в отчёт не попадают.\n'
+)
+
+
+class CycleProfiler:
+    """Профилирование N циклов опроса: cProfile и снимки tracemalloc.
+    Сессия включается методом arm() (флагом запуска или сигналом) и
+    охватывает заданное количество циклов. По завершении сессии
+    в каталог PROFILE_DIR сохраняются отчёты: сырые данные cProfile,
+    отсортированный текстовый отчёт и разница распределений памяти.
+    cProfile видит только поток, вызывающий start_cycle(); tracemalloc
+    учитывает память всех потоков.
+    """
+
+    def __init__(self, output_dir: str = PROFILE_DIR, cycles: int = 10):
+        """Init."""
+        self.output_dir = output_dir
+        self.cycles = cycles
+        self.remaining = 0
+        self.profile = None
+        self.first_snapshot = None
+        self.last_snapshot = None
+        self.cycle_diffs = []
+        self.started_tracemalloc = False
+
+    @property
+    def active(self) -> bool:
+        """Идёт ли сессия профилирования."""
+        return self.profile is not None
+
+    def arm(self, cycles: Optional[int] = None) -> None:
+        """Запрашивает профилирование следующих cycles циклов.
+        Запрос во время уже идущей сессии игнорируется.
+        """
+        if not self.active:
+            self.remaining = cycles or self.cycles
+
+    def install_signal(self, signum: Optional[int] = None) -> bool:
+        """Включает профилирование по сигналу (по умолчанию SIGUSR1).
+        Возвращает False, если сигнал недоступен на платформе.
+        """
+        signum = signum or getattr(signal, 'SIGUSR1', None)
+        if signum is None:
+            return False
+        signal.signal(signum, lambda signum, frame: self.arm())
+        return True
+
+    def start_cycle(self) -> None:
+        """Начинает профилирование очередного цикла, если оно запрошено.
+        При ошибке (например, уже работает другой профилировщик) сессия
+        отменяется, а исключение пробрасывается.
+        """
+        if not self.remaining:
+            return
+        try:
+            if not self.active:
+                self.started_tracemalloc = not tracemalloc.is_tracing()
+                if self.started_tracemalloc:
+                    tracemalloc.start(TRACEMALLOC_FRAMES)
+                self.profile = cProfile.Profile()
+                self.first_snapshot = self.last_snapshot = self._snapshot()
+                self.cycle_diffs = []
+            self.profile.enable()
+        except Exception:
+            self._reset()
+            raise
+
+    def end_cycle(self) -> List[str]:
+        """Завершает профилирование цикла.
+        После последнего цикла сессии сохраняет отчёты и возвращает
+        пути к ним, иначе возвращает пустой список.
+        """
+        if not self.active:
+            return []
+        self.profile.disable()
+        snapshot = self._snapshot()
+        self.cycle_diffs.append(self._top_diff(snapshot, self.last_snapshot))
+        self.last_snapshot = snapshot
+        self.remaining -= 1
+        if self.remaining > 0:
+            return []
+        try:
+            return self._dump()
+        finally:
+            self._reset()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+    @staticmethod
+    def _top_diff(snapshot, previous) -> List[str]:
+        stats = snapshot.compare_to(previous, 'lineno')
+        return [str(stat) for stat in stats[:PROFILE_LIMIT]]
+
+    def _dump(self) -> List[str]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(self.output_dir, f'profile-{stamp}-{os.getpid()}')
+
+        raw_path = f'{base}.prof'
+        self.profile.dump_stats(raw_path)
+
+        stats_path = f'{base}.txt'
+        with open(stats_path, 'w', encoding='utf-8') as stream:
+            stream.write(PROFILE_SCOPE)
+            stats = pstats.Stats(self.profile, stream=stream)
+            stats.sort_stats(PROFILE_SORT).print_stats(PROFILE_LIMIT)
+
+        memory_path = f'{base}-tracemalloc.txt'
+        with open(memory_path, 'w', encoding='utf-8') as stream:
+            stream.write('# Разница распределений за сессию\n')
+            stream.write('\n'.join(
+                self._top_diff(self.last_snapshot, self.first_snapshot)
+            ))
+            for number, diff in enumerate(self.cycle_diffs, start=1):
+                stream.write(f'\n\n# Цикл {number}\n')
+                stream.write('\n'.join(diff))
+            stream.write('\n')
+        return [raw_path, stats_path, memory_path]
+
+    def _reset(self) -> None:
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+        self.started_tracemalloc = False
+        self.profile = None
+        self.first_snapshot = self.last_snapshot = None
+        self.cycle_diffs = []
+        self.remaining = 0
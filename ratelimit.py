@@ -0,0 +1,114 @@
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, Optional
+
+from exceptions import ThrottledAPIError
+from metrics import metrics
+
+API_RATE = 2.0
+API_BURST = 10
+API_MAX_IN_FLIGHT = 4
+RETRY_AFTER_DEFAULT = 60
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None,
+                      default: float = RETRY_AFTER_DEFAULT) -> float:
+    """Разбирает заголовок Retry-After: число секунд или HTTP-дату."""
+    if not value:
+        return default
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return default
+    return max(0.0, moment - (time.time() if now is None else now))
+
+
+class RateLimiter:
+    """Общий для всех получателей ограничитель запросов к API.
+    Сочетает ведро токенов (rate запросов в секунду, не больше burst
+    подряд), ограничение числа одновременных запросов и паузу после
+    ответа 429 на время из Retry-After.
+    """
+
+    def __init__(self, rate: float = API_RATE, burst: int = API_BURST,
+                 max_in_flight: int = API_MAX_IN_FLIGHT,
+                 monotonic: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """Init."""
+        self.rate = rate
+        self.burst = burst
+        self.monotonic = monotonic
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.updated = monotonic()
+        self.blocked_until = 0.0
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    def _reserve(self) -> float:
+        """Забирает токен и возвращает 0 или время до появления токена."""
+        with self.lock:
+            now = self.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def throttle(self, retry_after: float) -> None:
+        """Приостанавливает запросы на retry_after секунд."""
+        with self.lock:
+            self.blocked_until = max(
+                self.blocked_until, self.monotonic() + retry_after
+            )
+            self.tokens = 0.0
+        metrics.set('api_retry_after_seconds', retry_after)
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float]) -> Iterator[None]:
+        """Ожидает разрешения на запрос не дольше timeout секунд.
+        С timeout=None ожидание не ограничено. Если разрешение не
+        получено вовремя, выбрасывает ThrottledAPIError.
+        ThrottledAPIError из тела блока (ответ 429) приостанавливает
+        запросы всех получателей.
+        """
+        started = self.monotonic()
+        while True:
+            wait = self._reserve()
+            if not wait:
+                break
+            if (timeout is not None
+                    and self.monotonic() - started + wait > timeout):
+                metrics.inc('api_rate_limited_total')
+                raise ThrottledAPIError(
+                    f'Лимит запросов к API: следующий через {wait:.1f} с',
+                    wait
+                )
+            metrics.inc('api_rate_limit_wait_seconds', wait)
+            self.sleep(wait)
+        remaining = None
+        if timeout is not None:
+            remaining = max(0.0, timeout - (self.monotonic() - started))
+        if not self.in_flight.acquire(timeout=remaining):
+            metrics.inc('api_rate_limited_total')
+            raise ThrottledAPIError(
+                'Лимит одновременных запросов к API', remaining
+            )
+        try:
+            yield
+        except ThrottledAPIError as error:
+            metrics.inc('api_throttled_total')
+            self.throttle(error.retry_after)
+            raise
+        finally:
+            self.in_flight.release()
@@ -0,0 +1,232 @@
+import hashlib
+import math
+from typing import Any, Dict, List, Optional
+
+SCHEDULER_RESOLUTION = 1.0
+SCHEDULER_SLOTS = 64
+SCHEDULER_LEVELS = 4
+
+
+class Timer:
+    """Таймер колеса: срок срабатывания и полезная нагрузка."""
+
+    __slots__ = ('when', 'tick', 'payload', 'slot')
+
+    def __init__(self, when: float, tick: int, payload: Any):
+        """Init."""
+        self.when = when
+        self.tick = tick
+        self.payload = payload
+        self.slot = None
+
+
+class TimingWheel:
+    """Иерархическое хешированное колесо таймеров.
+    Уровень L состоит из slots ячеек по slots ** L тиков длительностью
+    resolution секунд. Добавление и отмена таймера выполняются за O(1);
+    при переходе через границу ячейки верхнего уровня её таймеры
+    переносятся на нижние уровни. Время задаётся монотонными часами.
+    """
+
+    def __init__(self, start: float, resolution: float = SCHEDULER_RESOLUTION,
+                 slots: int = SCHEDULER_SLOTS, levels: int = SCHEDULER_LEVELS):
+        """Init."""
+        self.origin = start
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.current = 0
+        self.wheels = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self.count = 0
+
+    def __len__(self) -> int:
+        """Количество запланированных таймеров."""
+        return self.count
+
+    def _tick(self, when: float) -> int:
+        return math.floor((when - self.origin) / self.resolution)
+
+    def _place(self, timer: Timer) -> None:
+        delta = timer.tick - self.current
+        for level in range(self.levels):
+            if delta < self.slots ** (level + 1):
+                index = (timer.tick // self.slots ** level) % self.slots
+                timer.slot = self.wheels[level][index]
+                timer.slot[timer] = None
+                return
+        raise ValueError('Срок таймера за пределами колеса.')
+
+    def fits(self, when: float) -> bool:
+        """Помещается ли срок when в колесо."""
+        tick = math.ceil((when - self.origin) / self.resolution)
+        return max(tick, self.current) - self.current < (
+            self.slots ** self.levels
+        )
+
+    def schedule(self, when: float, payload: Any) -> Timer:
+        """Планирует срабатывание payload в момент when."""
+        tick = math.ceil((when - self.origin) / self.resolution)
+        timer = Timer(when, max(tick, self.current), payload)
+        self._place(timer)
+        self.count += 1
+        return timer
+
+    def cancel(self, timer: Timer) -> bool:
+        """Отменяет таймер. Возвращает False, если он уже сработал."""
+        if timer.slot is None:
+            return False
+        del timer.slot[timer]
+        timer.slot = None
+        self.count -= 1
+        return True
+
+    def advance(self, now: float) -> List[Timer]:
+        """Сдвигает колесо к моменту now и возвращает сработавшие таймеры.
+        Таймер срабатывает не раньше своего срока и не позже чем через
+        resolution секунд после него. Пустые тики пропускаются, поэтому
+        стоимость сдвига зависит от числа сработавших таймеров, а не от
+        прошедшего времени.
+        """
+        target = self._tick(now)
+        expired = []
+        while self.current <= target:
+            tick = self._next_tick()
+            if tick is None or tick > target:
+                self.current = target + 1
+                break
+            self.current = tick
+            self._cascade()
+            slot = self.wheels[0][self.current % self.slots]
+            for timer in slot:
+                timer.slot = None
+                expired.append(timer)
+            self.count -= len(slot)
+            slot.clear()
+            self.current += 1
+        return expired
+
+    def _cascade(self) -> None:
+        for level in range(self.levels - 1, 0, -1):
+            size = self.slots ** level
+            if self.current % size:
+                continue
+            slot = self.wheels[level][(self.current // size) % self.slots]
+            timers = list(slot)
+            slot.clear()
+            for timer in timers:
+                self._place(timer)
+
+    def _next_tick(self) -> Optional[int]:
+        """Ближайший тик, на котором колесу есть что делать.
+        Это тик таймера нижнего уровня или перенос непустой ячейки
+        верхнего уровня.
+        """
+        if not self.count:
+            return None
+        ticks = []
+        for offset in range(self.slots):
+            if self.wheels[0][(self.current + offset) % self.slots]:
+                ticks.append(self.current + offset)
+                break
+        for level in range(1, self.levels):
+            size = self.slots ** level
+            base = self.current // size
+            first = 0 if self.current % size == 0 else 1
+            for offset in range(first, self.slots + first):
+                if self.wheels[level][(base + offset) % self.slots]:
+                    ticks.append((base + offset) * size)
+                    break
+        return min(ticks)
+
+    def next_wakeup(self) -> Optional[float]:
+        """Ближайший момент, когда колесу нужно сдвинуться.
+        Это срок ближайшего таймера нижнего уровня или граница ближайшей
+        непустой ячейки верхнего уровня. None, если таймеров нет.
+        """
+        tick = self._next_tick()
+        if tick is None:
+            return None
+        return self.origin + tick * self.resolution
+
+
+def phase(key: str, interval: float) -> float:
+    """Детерминированное смещение в пределах interval по ключу key.
+    Смещения разных ключей равномерно распределены по периоду.
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') / 2 ** 64 * interval
+
+
+def next_run(anchor: float, offset: float, interval: float,
+             now: float) -> float:
+    """Ближайший момент вида anchor + offset + k * interval не раньше now."""
+    first = anchor + offset
+    if first >= now:
+        return first
+    return first + math.ceil((now - first) / interval) * interval
+
+
+class PollScheduler:
+    """Расписание опроса получателей на колесе таймеров.
+    Каждый получатель опрашивается раз в interval секунд со своим
+    детерминированным смещением. Следующий срок отсчитывается от
+    запланированного, а не от фактического времени опроса, поэтому
+    расписание не дрейфует.
+    """
+
+    def __init__(self, start: float, interval: float, **wheel_options):
+        """Init."""
+        self.anchor = start
+        self.interval = interval
+        self.wheel = TimingWheel(start, **wheel_options)
+        self.timers: Dict[str, Timer] = {}
+
+    def add(self, key: str, now: float, phase_key: Optional[str] = None,
+            when: Optional[float] = None) -> None:
+        """Планирует опрос key; when по умолчанию - ближайший по фазе."""
+        if when is None:
+            when = self.first_run(phase_key or key, now)
+        self.remove(key)
+        self.timers[key] = self.wheel.schedule(when, key)
+
+    def first_run(self, phase_key: str, now: float,
+                  interval: Optional[float] = None) -> float:
+        """Ближайший по фазе срок опроса с периодом interval.
+        Расписание не меняется. Если срок не помещается в колесо,
+        выбрасывает ValueError.
+        """
+        interval = self.interval if interval is None else interval
+        when = next_run(
+            self.anchor, phase(phase_key, interval), interval, now
+        )
+        if not self.wheel.fits(when):
+            raise ValueError('Срок опроса за пределами колеса таймеров.')
+        return when
+
+    def remove(self, key: str) -> None:
+        """Отменяет опрос key."""
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            self.wheel.cancel(timer)
+
+    def when(self, key: str) -> Optional[float]:
+        """Срок ближайшего опроса key."""
+        timer = self.timers.get(key)
+        return None if timer is None else timer.when
+
+    def due(self, now: float) -> List[str]:
+        """Ключи, срок опроса которых наступил; они планируются заново."""
+        keys = []
+        for timer in self.wheel.advance(now):
+            keys.append(timer.payload)
+            self.timers[timer.payload] = self.wheel.schedule(
+                next_run(timer.when, self.interval, self.interval, now),
+                timer.payload
+            )
+        return keys
+
+    def next_wakeup(self) -> Optional[float]:
+        """Ближайший момент, когда нужно проверить расписание."""
+        return self.wheel.next_wakeup()
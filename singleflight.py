@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from exceptions import DeadlineExceededError
+from metrics import metrics
+
+COALESCE_TTL = 5.0
+
+
+class _Call:
+    """Выполняющийся запрос и его итог."""
+
+    def __init__(self):
+        """Init."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Объединение одинаковых запросов.
+    Одновременные вызовы с одним ключом разделяют один выполняющийся
+    запрос и его результат; успешный результат ещё ttl секунд отдаётся
+    из кэша без нового запроса.
+    """
+
+    def __init__(self, ttl: float = COALESCE_TTL,
+                 monotonic: Callable[[], float] = time.monotonic):
+        """Init."""
+        self.ttl = ttl
+        self.monotonic = monotonic
+        self.lock = threading.Lock()
+        self.calls: Dict[Hashable, _Call] = {}
+        self.cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self.executed = 0
+        self.deduplicated = 0
+
+    def do(self, key: Hashable, request: Callable[[], Any],
+           timeout: Optional[float] = None) -> Any:
+        """Возвращает результат request() для key.
+        Ожидание чужого запроса ограничено timeout секунд.
+        """
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None and cached[0] > self.monotonic():
+                self._deduplicated()
+                return cached[1]
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.executed += 1
+        if not leader:
+            if not call.done.wait(timeout):
+                raise DeadlineExceededError(
+                    'Не дождались ответа объединённого запроса.'
+                )
+            with self.lock:
+                self._deduplicated()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        metrics.inc('api_requests_total')
+        try:
+            call.result = request()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+                if call.error is None:
+                    self._store(key, call.result)
+            call.done.set()
+        return call.result
+
+    def coalesce(self, count: int) -> None:
+        """Учитывает count запросов, объединённых вызывающей стороной."""
+        if count > 0:
+            with self.lock:
+                self._deduplicated(count)
+
+    def _deduplicated(self, count: int = 1) -> None:
+        self.deduplicated += count
+        metrics.inc('api_coalesced_total', count)
+
+    def _store(self, key: Hashable, result: Any) -> None:
+        now = self.monotonic()
+        for expired in [
+            cached_key for cached_key, (expires, _) in self.cache.items()
+            if expires <= now
+        ]:
+            del self.cache[expired]
+        if self.ttl > 0:
+            self.cache[key] = (now + self.ttl, result)
@@ -0,0 +1,370 @@
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import homework
+from config import Config, TenantConfig
+from profiling import CycleProfiler
+
+SOAK_DAYS = 30
+SOAK_WARMUP_CYCLES = 50
+SOAK_SAMPLE_EVERY = 50
+SECONDS_IN_DAY = 24 * 60 * 60
+
+
+class VirtualClock:
+    """Виртуальные часы: sleep() мгновенно сдвигает время вперёд."""
+
+    def __init__(self, start: Optional[float] = None):
+        """Init."""
+        self.now = time.time() if start is None else start
+        self.offset = 0.0
+
+    def time(self) -> float:
+        """Текущее виртуальное время (аналог time.time)."""
+        return self.now + self.offset
+
+    def monotonic(self) -> float:
+        """Монотонное виртуальное время (аналог time.monotonic)."""
+        return self.offset
+
+    def sleep(self, seconds: float) -> None:
+        """Сдвигает виртуальное время на seconds секунд."""
+        self.offset += seconds
+
+
+class StandInBot:
+    """Заменитель tg.Bot: считает отправленные сообщения."""
+
+    def __init__(self):
+        """Init."""
+        self.sent = 0
+
+    def send_message(self, chat_id=None, text=None, **kwargs) -> None:
+        """Имитирует отправку сообщения."""
+        self.sent += 1
+
+
+class StandInAPI:
+    """Локальный HTTP-сервер, имитирующий API Практикум.Домашки.
+    Ответы чередуются детерминированно: пустые, со сменой статуса,
+    с недокументированным статусом, с кодом 500 и с некорректным json,
+    чтобы в цикле опроса срабатывали и успешные, и ошибочные ветви.
+    """
+
+    STATUSES = ('reviewing', 'rejected', 'approved')
+
+    def __init__(self, clock: VirtualClock):
+        """Init."""
+        self.clock = clock
+        self.requests = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        """Адрес эндпоинта заменителя."""
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/api/user_api/homework_statuses/'
+
+    def __enter__(self) -> 'StandInAPI':
+        """Запускает сервер."""
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Останавливает сервер."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def answer(self, from_date: int):
+        """Возвращает код и тело ответа для очередного запроса."""
+        self.requests += 1
+        number = self.requests
+        if number % 10 == 3:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, b'{}'
+        if number % 10 == 5:
+            return HTTPStatus.OK, b'not json'
+        homeworks = []
+        if number % 10 == 7:
+            homeworks.append({'homework_name': 'hw', 'status': 'unknown'})
+        elif number % 4 == 0:
+            homeworks.append({
+                'homework_name': f'hw{number % 50}',
+                'status': self.STATUSES[number % len(self.STATUSES)],
+            })
+        body = {
+            'homeworks': homeworks,
+            'current_date': max(from_date, int(self.clock.time())),
+        }
+        return HTTPStatus.OK, json.dumps(body).encode()
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                from_date = int(float(query.get('from_date', ['0'])[0]))
+                status, body = stand_in.answer(from_date)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@dataclass
+class SoakBudget:
+    """Допустимый рост ресурсов за время прогона после разогрева."""
+
+    rss_growth_mb: float = 16.0
+    traced_growth_kb: float = 512.0
+    objects_growth: int = 2000
+    latency_growth: float = 3.0
+    latency_p99_ms: float = 250.0
+
+
+@dataclass
+class SoakSample:
+    """Замер ресурсов после очередного цикла."""
+
+    cycle: int
+    rss: int
+    traced: int
+    objects: int
+
+
+@dataclass
+class SoakResult:
+    """Итоги прогона."""
+
+    cycles: int
+    virtual_seconds: float
+    latencies: List[float] = field(default_factory=list, repr=False)
+    samples: List[SoakSample] = field(default_factory=list, repr=False)
+    failures: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Уложился ли прогон в бюджеты."""
+        return not self.failures
+
+    def report(self) -> str:
+        """Текстовый отчёт о прогоне."""
+        first, last = self.samples[0], self.samples[-1]
+        latencies = sorted(self.latencies)
+        days = self.virtual_seconds / SECONDS_IN_DAY
+        median = statistics.median(latencies) * 1000
+        lines = [
+            f'Циклов: {self.cycles}; виртуального времени: {days:.1f} сут.',
+            f'RSS: {first.rss / 2 ** 20:.1f} -> {last.rss / 2 ** 20:.1f} МБ',
+            f'tracemalloc: {first.traced / 1024:.1f} -> '
+            f'{last.traced / 1024:.1f} КБ',
+            f'Объектов gc: {first.objects} -> {last.objects}',
+            f'Задержка цикла: медиана {median:.2f} мс, '
+            f'p99 {percentile(latencies, 0.99) * 1000:.2f} мс',
+        ]
+        lines.extend(f'ПРЕВЫШЕН БЮДЖЕТ: {error}' for error in self.failures)
+        return '\n'.join(lines)
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Перцентиль отсортированного списка."""
+    index = min(len(ordered) - 1, int(len(ordered) * fraction))
+    return ordered[index]
+
+
+def rss_bytes() -> int:
+    """Текущий размер резидентной памяти процесса."""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def traced_bytes() -> int:
+    """Объём памяти, выделенной вне самого soak-теста."""
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+    return sum(stat.size for stat in snapshot.statistics('filename'))
+
+
+def take_sample(cycle: int) -> SoakSample:
+    """Снимает замер ресурсов."""
+    gc.collect()
+    return SoakSample(
+        cycle=cycle,
+        rss=rss_bytes(),
+        traced=traced_bytes(),
+        objects=len(gc.get_objects()),
+    )
+
+
+def check_budget(result: SoakResult, budget: SoakBudget,
+                 warmup: int) -> None:
+    """Сравнивает рост ресурсов и задержек с бюджетом."""
+    first, last = result.samples[0], result.samples[-1]
+    rss_growth = (last.rss - first.rss) / 2 ** 20
+    if rss_growth > budget.rss_growth_mb:
+        result.failures.append(
+            f'рост RSS {rss_growth:.1f} МБ > {budget.rss_growth_mb} МБ'
+        )
+    traced_growth = (last.traced - first.traced) / 1024
+    if traced_growth > budget.traced_growth_kb:
+        result.failures.append(
+            f'рост tracemalloc {traced_growth:.1f} КБ > '
+            f'{budget.traced_growth_kb} КБ'
+        )
+    objects_growth = last.objects - first.objects
+    if objects_growth > budget.objects_growth:
+        result.failures.append(
+            f'рост числа объектов {objects_growth} > {budget.objects_growth}'
+        )
+    measured = result.latencies[warmup:]
+    window = max(1, len(measured) // 10)
+    early = statistics.median(measured[:window])
+    late = statistics.median(measured[-window:])
+    if early and late / early > budget.latency_growth:
+        result.failures.append(
+            f'рост задержки цикла в {late / early:.1f} раз > '
+            f'{budget.latency_growth}'
+        )
+    p99 = percentile(sorted(measured), 0.99) * 1000
+    if p99 > budget.latency_p99_ms:
+        result.failures.append(
+            f'p99 задержки цикла {p99:.1f} мс > {budget.latency_p99_ms} мс'
+        )
+
+
+def soak_config() -> Config:
+    """Конфигурация с одним получателем для прогона."""
+    return Config(
+        retry_time=homework.RETRY_TIME,
+        homework_statuses=dict(homework.HOMEWORK_STATUSES),
+        tenants=(TenantConfig('soak', 'soak', 'soak', 'soak'),),
+    )
+
+
+def soak(cycles: int, budget: Optional[SoakBudget] = None,
+         warmup: int = SOAK_WARMUP_CYCLES,
+         sample_every: int = SOAK_SAMPLE_EVERY) -> SoakResult:
+    """Прогоняет настоящий цикл опроса на виртуальных часах.
+    Цикл homework.run работает против локальных заменителей API и Telegram;
+    после разогрева замеряются память, число объектов и задержка циклов
+    вместе с доставкой сообщений.
+    """
+    budget = budget or SoakBudget()
+    warmup = min(warmup, cycles - 1)
+    clock = VirtualClock()
+    bot = StandInBot()
+    result = SoakResult(cycles=cycles, virtual_seconds=0)
+    marks = {'last': time.perf_counter()}
+
+    def on_cycle(cycle: int) -> None:
+        worker.dispatcher.drain()
+        result.latencies.append(time.perf_counter() - marks['last'])
+        if cycle > warmup and (
+            (cycle - warmup - 1) % sample_every == 0 or cycle == cycles
+        ):
+            result.samples.append(take_sample(cycle))
+        marks['last'] = time.perf_counter()
+
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    endpoint = homework.ENDPOINT
+    devnull = open(os.devnull, 'w')
+    stream = homework.handler.setStream(devnull)
+    bot_handler = homework.add_bot_handler(bot)
+    try:
+        with StandInAPI(clock) as api:
+            homework.ENDPOINT = api.url
+            worker = homework.Worker(
+                soak_config(), bot_factory=lambda token: bot, clock=clock
+            )
+            try:
+                homework.run(worker, CycleProfiler(), clock=clock,
+                             cycles=cycles, on_cycle=on_cycle)
+            finally:
+                worker.close()
+    finally:
+        homework.ENDPOINT = endpoint
+        homework.logger.removeHandler(bot_handler)
+        homework.handler.setStream(stream)
+        devnull.close()
+        if started_tracemalloc:
+            tracemalloc.stop()
+    result.virtual_seconds = clock.monotonic()
+    check_budget(result, budget, warmup)
+    return result
+
+
+def main() -> None:
+    """Запуск soak-теста из командной строки."""
+    defaults = SoakBudget()
+    parser = argparse.ArgumentParser(
+        description='Soak-тест цикла опроса на виртуальных часах.'
+    )
+    parser.add_argument('--days', type=float, default=SOAK_DAYS,
+                        help='длительность прогона в виртуальных сутках')
+    parser.add_argument('--retry-time', type=int, default=homework.RETRY_TIME,
+                        help='период опроса в секундах')
+    parser.add_argument('--warmup', type=int, default=SOAK_WARMUP_CYCLES)
+    parser.add_argument('--sample-every', type=int, default=SOAK_SAMPLE_EVERY)
+    parser.add_argument('--rss-growth-mb', type=float,
+                        default=defaults.rss_growth_mb)
+    parser.add_argument('--traced-growth-kb', type=float,
+                        default=defaults.traced_growth_kb)
+    parser.add_argument('--objects-growth', type=int,
+                        default=defaults.objects_growth)
+    parser.add_argument('--latency-growth', type=float,
+                        default=defaults.latency_growth)
+    parser.add_argument('--latency-p99-ms', type=float,
+                        default=defaults.latency_p99_ms)
+    args = parser.parse_args()
+
+    homework.RETRY_TIME = args.retry_time
+    cycles = max(2, int(args.days * SECONDS_IN_DAY // args.retry_time))
+    result = soak(
+        cycles,
+        SoakBudget(
+            rss_growth_mb=args.rss_growth_mb,
+            traced_growth_kb=args.traced_growth_kb,
+            objects_growth=args.objects_growth,
+            latency_growth=args.latency_growth,
+            latency_p99_ms=args.latency_p99_ms,
+        ),
+        warmup=args.warmup,
+        sample_every=args.sample_every,
+    )
+    print(result.report())
+    sys.exit(0 if result.ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from telegram.error import BadRequest
+
+from metrics import metrics
+
+BOARD_DEBOUNCE = 30
+BOARD_TITLE = 'Статусы проверки домашних работ'
+FINAL_STATUSES = ('approved', 'rejected')
+
+
+class StatusBoard:
+    """Закреплённое сообщение со статусами работ в одном чате.
+    Вместо нового сообщения на каждую смену статуса сообщение
+    редактируется. Одинаковые правки пропускаются, а несколько смен
+    статуса подряд объединяются в одну правку: между правками проходит
+    не меньше debounce секунд. update() можно вызывать, пока flush()
+    выполняется в другом потоке: запросы к Telegram идут без блокировки.
+    """
+
+    def __init__(self, bot: Any, chat_id: str,
+                 debounce: float = BOARD_DEBOUNCE,
+                 monotonic: Callable[[], float] = time.monotonic):
+        """Init."""
+        self.bot = bot
+        self.chat_id = chat_id
+        self.debounce = debounce
+        self.monotonic = monotonic
+        self.lock = threading.Lock()
+        self.message_id = None
+        self.pinned = False
+        self.text = None
+        self.lines: Dict[str, str] = {}
+        self.last_edit = None
+        self.dirty = False
+
+    def state(self) -> Dict[str, Any]:
+        """Состояние для сохранения между перезапусками."""
+        with self.lock:
+            return {
+                'message_id': self.message_id,
+                'pinned': self.pinned,
+                'lines': dict(self.lines),
+            }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Восстанавливает состояние, сохранённое state().
+        Сообщение продолжает редактироваться, а не отправляется и
+        закрепляется заново.
+        """
+        message_id = state['message_id']
+        pinned = bool(state.get('pinned', True))
+        lines = dict(state['lines'])
+        with self.lock:
+            self.message_id = message_id
+            self.pinned = pinned
+            self.lines = lines
+            self.text = self.render()
+
+    @property
+    def pending(self) -> bool:
+        """Есть ли что отправить: правки или незакреплённое сообщение."""
+        return self.dirty or (self.message_id is not None
+                              and not self.pinned)
+
+    def update(self, homework_name: str, line: str) -> None:
+        """Запоминает строку о работе; отправка - в flush()."""
+        with self.lock:
+            if self.lines.get(homework_name) == line:
+                metrics.inc('board_edits_skipped_total')
+                return
+            self.lines[homework_name] = line
+            self.dirty = True
+
+    def render(self) -> str:
+        """Текст сообщения."""
+        return '\n'.join([BOARD_TITLE, *(
+            f'"{name}": {line}' for name, line in self.lines.items()
+        )])
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Отправляет или редактирует сообщение.
+        Сначала закрепляет сообщение, если прошлое закрепление не
+        удалось. Ничего не отправляет, если изменений нет, текст
+        совпадает с отправленным или окно debounce ещё не истекло.
+        Возвращает True, если сообщение изменилось.
+        """
+        changed = self._pin(timeout)
+        text = self._due()
+        if text is None:
+            return changed
+        try:
+            if self.message_id is None:
+                self._post(text, timeout)
+            else:
+                self._edit(text, timeout)
+        except Exception:
+            with self.lock:
+                self.dirty = True
+            raise
+        with self.lock:
+            self.text = text
+            self.last_edit = self.monotonic()
+        return True
+
+    def _due(self) -> Optional[str]:
+        """Текст для отправки или None, если отправлять нечего."""
+        with self.lock:
+            if not self.dirty:
+                return None
+            text = self.render()
+            if text == self.text:
+                self.dirty = False
+                metrics.inc('board_edits_skipped_total')
+                return None
+            if (self.last_edit is not None
+                    and self.monotonic() - self.last_edit < self.debounce):
+                metrics.inc('board_edits_debounced_total')
+                return None
+            self.dirty = False
+            return text
+
+    def _post(self, text: str, timeout: Optional[float]) -> None:
+        message = self.bot.send_message(
+            chat_id=self.chat_id, text=text, timeout=timeout
+        )
+        with self.lock:
+            self.message_id = message.message_id
+            self.pinned = False
+            self.text = text
+        metrics.inc('board_posts_total')
+        self._pin(timeout)
+
+    def _pin(self, timeout: Optional[float]) -> bool:
+        """Закрепляет отправленное сообщение, если оно ещё не закреплено."""
+        if self.message_id is None or self.pinned:
+            return False
+        self.bot.pin_chat_message(
+            chat_id=self.chat_id, message_id=self.message_id,
+            disable_notification=True, timeout=timeout
+        )
+        self.pinned = True
+        return True
+
+    def _edit(self, text: str, timeout: Optional[float]) -> None:
+        try:
+            self.bot.edit_message_text(
+                text, chat_id=self.chat_id, message_id=self.message_id,
+                timeout=timeout
+            )
+        except BadRequest as error:
+            if 'not modified' in str(error).lower():
+                metrics.inc('board_edits_skipped_total')
+                return
+            self.message_id = None
+            raise
+        metrics.inc('board_edits_total')
+
+
+class BoardStore:
+    """Json-файл с состоянием закреплённых сообщений.
+    Состояния хранятся по имени получателя, затем по чату.
+    """
+
+    def __init__(self, path: str):
+        """Init."""
+        self.path = path
+
+    def load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Сохранённые состояния; без файла - пустой словарь."""
+        try:
+            with open(self.path, encoding='utf-8') as state_file:
+                states = json.load(state_file)
+        except FileNotFoundError:
+            return {}
+        if not isinstance(states, dict):
+            raise ValueError(f'Некорректный файл состояния {self.path}.')
+        return states
+
+    def save(self, states: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        """Атомарно записывает состояния."""
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as state_file:
+            json.dump(states, state_file, ensure_ascii=False)
+        os.replace(temporary, self.path)
@@ -1,9 +1,28 @@
 import sys
 from os.path import abspath, dirname
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 
 pytest_plugins = [
     'tests.fixtures.fixture_data'
 ]
+
+
+@pytest.fixture
+def make_worker():
+    """Создаёт Worker и останавливает его пулы после теста."""
+    import homework
+
+    workers = []
+
+    def make(*args, **kwargs):
+        worker = homework.Worker(*args, **kwargs)
+        workers.append(worker)
+        return worker
+
+    yield make
+    for worker in workers:
+        worker.close()
@@ -0,0 +1,205 @@
+import json
+
+import pytest
+from telegram.error import InvalidToken
+
+import homework
+from config import Config, TenantConfig, load_config
+from exceptions import ConfigError
+
+DEFAULTS = Config(
+    retry_time=600,
+    homework_statuses={'approved': 'Ура!'},
+    tenants=(TenantConfig('default', 'p', 't', '1'),),
+)
+
+
+def write_config(path, **data):
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return str(path)
+
+
+def tenant(name, practicum_token='p', telegram_token='t', chat_id=1):
+    return {
+        'name': name,
+        'practicum_token': practicum_token,
+        'telegram_token': telegram_token,
+        'chat_id': chat_id,
+    }
+
+
+class TestLoadConfig:
+
+    def test_defaults_without_file(self):
+        assert load_config(None, DEFAULTS) == DEFAULTS
+
+    def test_file_overrides_defaults(self, tmp_path):
+        path = write_config(
+            tmp_path / 'config.json', retry_time=60, tenants=[tenant('a')]
+        )
+        config = load_config(path, DEFAULTS)
+        assert config.retry_time == 60
+        assert config.homework_statuses == DEFAULTS.homework_statuses
+        assert config.tenants == (TenantConfig('a', 'p', 't', '1'),)
+
+    @pytest.mark.parametrize('data', [
+        {'retry_time': 0},
+        {'retry_time': '600'},
+        {'retry_time': 100000000},
+        {'homework_statuses': {'approved': ''}},
+        {'tenants': []},
+        {'tenants': [tenant('a'), tenant('a')]},
+        {'tenants': [{'name': 'a'}]},
+        {'tenants': [dict(tenant('a'), status_board='yes')]},
+        {'tenants': [dict(tenant('a'), locale='xx')]},
+        {'verdicts': {'xx': {'approved': 'Approved'}}},
+        {'verdicts': {'en': {'approved': ''}}},
+        {'verdicts': {'en': 'Approved'}},
+    ])
+    def test_invalid_config(self, tmp_path, data):
+        path = write_config(tmp_path / 'config.json', **data)
+        with pytest.raises(ConfigError):
+            load_config(path, DEFAULTS)
+
+    def test_notifier_error_hides_secrets(self, tmp_path):
+        path = write_config(
+            tmp_path / 'config.json', tenants=[tenant('a')],
+            notifiers={'a': [{
+                'type': 'smtp', 'host': 'smtp', 'password': 'S3CRET',
+                'sender': 'bot', 'recipients': ['a'], 'pasword': 'S3CRET',
+            }]},
+        )
+        with pytest.raises(ConfigError) as error:
+            load_config(path, DEFAULTS)
+        assert 'S3CRET' not in str(error.value), (
+            'Пароли и токены каналов не должны попадать в текст ошибки'
+        )
+        assert 'smtp' in str(error.value) and 'pasword' in str(error.value)
+
+    def test_broken_file(self, tmp_path):
+        path = tmp_path / 'config.json'
+        path.write_text('{', encoding='utf-8')
+        with pytest.raises(ConfigError):
+            load_config(str(path), DEFAULTS)
+
+
+class TestWorkerReload:
+
+    @pytest.fixture(autouse=True)
+    def restore_globals(self, monkeypatch):
+        monkeypatch.setattr(homework, 'RETRY_TIME', homework.RETRY_TIME)
+        monkeypatch.setattr(
+            homework, 'HOMEWORK_STATUSES', homework.HOMEWORK_STATUSES
+        )
+        monkeypatch.setattr(
+            homework, 'LOCALE_VERDICTS', homework.LOCALE_VERDICTS
+        )
+
+    def test_reload_keeps_unchanged_tenants(self, tmp_path, make_worker):
+        path = write_config(
+            tmp_path / 'config.json', tenants=[tenant('a'), tenant('b')]
+        )
+        worker = make_worker(DEFAULTS, path, bot_factory=lambda token: object())
+        a, b = worker.tenants['a'], worker.tenants['b']
+        a.current_timestamp = b.current_timestamp = 42
+
+        write_config(
+            tmp_path / 'config.json', retry_time=60,
+            homework_statuses={'approved': 'Принято'},
+            verdicts={'en': {'approved': 'Accepted'}},
+            tenants=[tenant('a'), tenant('b', chat_id=2), tenant('c')],
+        )
+        worker.request_reload()
+        worker.reload_if_needed()
+
+        assert worker.tenants['a'] is a, (
+            'Получатель с неизменными настройками должен сохраняться'
+        )
+        assert worker.tenants['b'].config.chat_id == '2'
+        assert worker.tenants['b'].bot is b.bot
+        assert worker.tenants['b'].current_timestamp == 42
+        assert 'c' in worker.tenants
+        assert worker.scheduler.when('c') is not None, (
+            'Новый получатель должен попадать в расписание опроса'
+        )
+        assert homework.RETRY_TIME == 60
+        assert homework.HOMEWORK_STATUSES == {'approved': 'Принято'}
+        assert homework.LOCALE_VERDICTS == {'en': {'approved': 'Accepted'}}
+
+    def test_invalid_config_keeps_running(self, tmp_path, make_worker):
+        path = write_config(tmp_path / 'config.json', tenants=[tenant('a')])
+        worker = make_worker(DEFAULTS, path, bot_factory=lambda token: object())
+        config, tenants = worker.config, worker.tenants
+
+        write_config(tmp_path / 'config.json', retry_time=-1)
+        worker.request_reload()
+        worker.reload_if_needed()
+
+        assert worker.config is config
+        assert worker.tenants is tenants
+        assert homework.RETRY_TIME == DEFAULTS.retry_time
+
+    def test_failed_schedule_keeps_running(self, tmp_path, make_worker):
+        path = write_config(
+            tmp_path / 'config.json', tenants=[tenant('a'), tenant('b')]
+        )
+        worker = make_worker(DEFAULTS, path, bot_factory=lambda token: object())
+        when = worker.scheduler.when('b')
+
+        with pytest.raises(ValueError):
+            worker.apply(Config(
+                retry_time=10 ** 9,
+                homework_statuses=DEFAULTS.homework_statuses,
+                tenants=worker.config.tenants,
+            ))
+        assert worker.scheduler.interval == 600
+        assert worker.scheduler.when('b') == when, (
+            'Отклонённое расписание не должно менять действующее'
+        )
+
+    def test_invalid_token_keeps_running(self, tmp_path, make_worker):
+        def bot_factory(token):
+            if ' ' in token:
+                raise InvalidToken()
+            return object()
+
+        path = write_config(tmp_path / 'config.json', tenants=[tenant('a')])
+        worker = make_worker(DEFAULTS, path, bot_factory=bot_factory)
+        config, tenants = worker.config, worker.tenants
+        a = tenants['a']
+        notifiers = list(a.notifiers)
+
+        write_config(
+            tmp_path / 'config.json', retry_time=60,
+            tenants=[tenant('a'), tenant('b', telegram_token='bad token')],
+            subscriptions={'a': [2]},
+        )
+        worker.request_reload()
+        worker.reload_if_needed()
+
+        assert worker.config is config
+        assert worker.tenants is tenants and worker.tenants['a'] is a
+        assert a.notifiers == notifiers, (
+            'Неудачная перезагрузка не должна менять каналы получателей'
+        )
+        assert homework.RETRY_TIME == DEFAULTS.retry_time
+
+
+class TestSubscriptions:
+
+    def test_subscribers_include_tenant_chat(self, tmp_path):
+        path = write_config(
+            tmp_path / 'config.json', tenants=[tenant('a'), tenant('b')],
+            subscriptions={'a': [1, 2, '@group']},
+        )
+        config = load_config(path, DEFAULTS)
+        a, b = config.tenants
+        assert config.subscribers(a) == ('1', '2', '@group')
+        assert config.subscribers(b) == ('1',)
+
+    def test_unknown_tenant_subscription(self, tmp_path):
+        path = write_config(
+            tmp_path / 'config.json', subscriptions={'missing': [1]}
+        )
+        with pytest.raises(ConfigError):
+            load_config(path, DEFAULTS)
@@ -0,0 +1,244 @@
+import threading
+import time
+from functools import partial
+
+import pytest
+from telegram.error import BadRequest, Unauthorized
+from utils import FakeClock, MockResponse, mock_api
+
+import homework
+from config import Config, TenantConfig
+from credentials import CredentialValidator, probe_practicum, probe_telegram
+from exceptions import (InvalidCredentialsError, StatusAPIResponseError,
+                        ThrottledAPIError)
+from ratelimit import RateLimiter
+
+
+class Probes:
+
+    def __init__(self, bad_tokens=(), broken_tokens=(), delay=0):
+        self.bad_tokens = set(bad_tokens)
+        self.broken_tokens = set(broken_tokens)
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def practicum(self, token, timeout):
+        with self.lock:
+            self.calls.append(token)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        if token in self.bad_tokens:
+            raise InvalidCredentialsError('401')
+        if token in self.broken_tokens:
+            raise ConnectionError('network')
+
+    def telegram(self, token, chat_id, timeout):
+        with self.lock:
+            self.calls.append((token, chat_id))
+
+
+def tenants(count, practicum_token=None):
+    return [
+        TenantConfig(
+            f't{index}', practicum_token or f'p{index}', 'bot', str(index)
+        )
+        for index in range(count)
+    ]
+
+
+class TestCredentialValidator:
+
+    def test_probes_run_concurrently_with_bounded_parallelism(self):
+        probes = Probes(delay=0.02)
+        validator = CredentialValidator(
+            probes.practicum, probes.telegram, workers=8
+        )
+        started = time.monotonic()
+        checks = validator.validate(tenants(80))
+        assert time.monotonic() - started < 80 * 0.02 / 2, (
+            'Проверки должны выполняться одновременно'
+        )
+        assert 1 < probes.max_running <= 8, (
+            'Одновременно выполняется не больше workers проверок'
+        )
+        assert all(check.ok for check in checks.values())
+
+    def test_shared_credentials_probed_once(self):
+        probes = Probes()
+        validator = CredentialValidator(probes.practicum, probes.telegram)
+        validator.validate(tenants(5, practicum_token='shared'))
+        assert probes.calls.count('shared') == 1
+        assert validator.probes == 6
+
+    def test_results_cached_for_ttl(self):
+        clock = FakeClock()
+        probes = Probes(bad_tokens={'p1'}, broken_tokens={'p2'})
+        validator = CredentialValidator(
+            probes.practicum, probes.telegram, ttl=60,
+            monotonic=clock.monotonic
+        )
+        validator.validate(tenants(3))
+        probes.calls.clear()
+        checks = validator.validate(tenants(3))
+        assert probes.calls == ['p2'], (
+            'Подтверждения и отказы кэшируются, сбои проверки - нет'
+        )
+        assert checks['t1'].invalid
+        assert not checks['t2'].ok and not checks['t2'].invalid
+        clock.sleep(60)
+        probes.calls.clear()
+        validator.validate(tenants(3))
+        assert len(probes.calls) == 6
+
+
+class TestProbes:
+
+    @pytest.mark.parametrize('status_code, error', [
+        (401, InvalidCredentialsError),
+        (403, InvalidCredentialsError),
+        (500, StatusAPIResponseError),
+    ])
+    def test_practicum(self, monkeypatch, status_code, error):
+        mock_api(monkeypatch, MockResponse(status_code=status_code))
+        with pytest.raises(error):
+            probe_practicum(homework.ENDPOINT, 'token')
+
+    def test_practicum_throttled(self, monkeypatch):
+        mock_api(monkeypatch, MockResponse(
+            status_code=429, headers={'Retry-After': '30'}
+        ))
+        clock = FakeClock()
+        limiter = homework.api_limiter(clock)
+        with pytest.raises(ThrottledAPIError):
+            probe_practicum(
+                homework.ENDPOINT, 'token', throttle=limiter.throttle
+            )
+        with pytest.raises(ThrottledAPIError):
+            with limiter.acquire(10):
+                pass
+        clock.sleep(30)
+        with limiter.acquire(10):
+            pass
+
+    def test_practicum_probes_wait_for_own_limiter(self, monkeypatch):
+        mock_api(monkeypatch, MockResponse())
+        limiter = RateLimiter(rate=200, burst=1, max_in_flight=2)
+        validator = CredentialValidator(
+            partial(probe_practicum, homework.ENDPOINT, limiter=limiter),
+            Probes().telegram, workers=8, timeout=0.001
+        )
+        checks = validator.validate(tenants(40))
+        assert all(check.ok for check in checks.values()), (
+            'Проверки ждут своего ограничителя, а не отклоняются им'
+        )
+
+    @pytest.mark.parametrize('error', [
+        Unauthorized('Unauthorized'), BadRequest('Chat not found')
+    ])
+    def test_telegram(self, error):
+        class Bot:
+            def __init__(self, token):
+                pass
+
+            def get_chat(self, chat_id, timeout=None):
+                raise error
+
+        with pytest.raises(InvalidCredentialsError):
+            probe_telegram('token', '1', bot_factory=Bot)
+
+
+def settle(worker):
+    worker.revalidate_if_needed()
+    worker.validation.result(5)
+    worker.revalidate_if_needed()
+
+
+class TestQuarantine:
+
+    def test_invalid_tenant_not_polled_until_fixed(self, make_worker):
+        clock = FakeClock()
+        probes = Probes(bad_tokens={'bad'})
+        validator = CredentialValidator(
+            probes.practicum, probes.telegram, ttl=3600,
+            monotonic=clock.monotonic
+        )
+        config = Config(
+            retry_time=600,
+            homework_statuses=dict(homework.HOMEWORK_STATUSES),
+            tenants=(
+                TenantConfig('good', 'ok', 't', '1'),
+                TenantConfig('broken', 'bad', 't', '2'),
+            ),
+        )
+        worker = make_worker(
+            config, bot_factory=lambda token: object(), clock=clock,
+            validator=validator
+        )
+        assert not worker.quarantined, 'Проверка не задерживает запуск'
+        settle(worker)
+        assert set(worker.quarantined) == {'broken'}
+        polled = set()
+        for _ in range(5):
+            clock.sleep(600)
+            polled.update(tenant.config.name for tenant in worker.due())
+        assert polled == {'good'}, 'Получатель на карантине не опрашивается'
+
+        probes.bad_tokens.clear()
+        worker.revalidate_if_needed()
+        assert 'broken' in worker.quarantined, (
+            'Отказ кэшируется до истечения ttl'
+        )
+        clock.sleep(3600)
+        settle(worker)
+        assert not worker.quarantined
+        assert worker.scheduler.when('broken') is not None
+
+    def test_failed_check_retried(self, make_worker):
+        clock = FakeClock()
+        probes = Probes(broken_tokens={'flaky'})
+        validator = CredentialValidator(
+            probes.practicum, probes.telegram, ttl=3600, retry=300,
+            monotonic=clock.monotonic
+        )
+        config = Config(
+            retry_time=600,
+            homework_statuses=dict(homework.HOMEWORK_STATUSES),
+            tenants=(TenantConfig('flaky', 'flaky', 't', '1'),),
+        )
+        worker = make_worker(
+            config, bot_factory=lambda token: object(), clock=clock,
+            validator=validator
+        )
+        settle(worker)
+        assert set(worker.unverified) == {'flaky'}
+        assert not worker.quarantined
+
+        probes.broken_tokens.clear()
+        probes.bad_tokens.add('flaky')
+        clock.sleep(300)
+        settle(worker)
+        assert not worker.unverified
+        assert set(worker.quarantined) == {'flaky'}, (
+            'Сорванная проверка повторяется по расписанию'
+        )
+
+
+class TestCheckCredentials:
+
+    def test_unverified_tenants_counted(self):
+        probes = Probes(bad_tokens={'p0'}, broken_tokens={'p1'})
+        validator = CredentialValidator(probes.practicum, probes.telegram)
+        config = Config(
+            retry_time=600,
+            homework_statuses=dict(homework.HOMEWORK_STATUSES),
+            tenants=tenants(3),
+        )
+        assert homework.check_credentials(config, validator) == 2, (
+            'Непроверенные получатели тоже дают ненулевой код возврата'
+        )
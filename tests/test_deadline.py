@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import homework
+from deadline import Deadline, Hedger
+from exceptions import DeadlineExceededError, GetAPIRequestError
+
+
+class SlowFirstRequest:
+
+    def __init__(self, slow=1.0):
+        self.slow = slow
+        self.calls = 0
+        self.timeouts = []
+        self.lock = threading.Lock()
+
+    def __call__(self, timeout):
+        with self.lock:
+            self.calls += 1
+            number = self.calls
+            self.timeouts.append(timeout)
+        if number % 2:
+            time.sleep(self.slow)
+            return 'primary'
+        return 'hedge'
+
+
+class TestDeadline:
+
+    def test_remaining(self):
+        now = [100.0]
+        deadline = Deadline(10, lambda: now[0])
+        assert deadline.timeout() == 10
+        assert deadline.timeout(3) == 3
+        now[0] = 115.0
+        assert deadline.expired
+        with pytest.raises(DeadlineExceededError):
+            deadline.timeout()
+
+    def test_request_api_answer_timeout(self, monkeypatch):
+        calls = []
+
+        def mock_get(*args, **kwargs):
+            calls.append(kwargs)
+            raise requests.exceptions.Timeout()
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        with pytest.raises(GetAPIRequestError):
+            homework.request_api_answer(1, {}, timeout=2.5)
+        assert calls[0]['timeout'] == 2.5, (
+            'Запрос к API должен выполняться с таймаутом'
+        )
+
+
+class TestHedger:
+
+    def test_disabled_runs_inline(self):
+        hedger = Hedger()
+        request = SlowFirstRequest(slow=0)
+        assert hedger.call(request, Deadline(5)) == 'primary'
+        assert hedger.hedges == 0
+
+    def test_hedge_wins_over_slow_primary(self):
+        hedger = Hedger(ratio=1.0, delay=0.05)
+        request = SlowFirstRequest(slow=1.0)
+        started = time.monotonic()
+        assert hedger.call(request, Deadline(5)) == 'hedge'
+        hedger.shutdown()
+        assert time.monotonic() - started < 0.5
+        assert hedger.hedges == hedger.hedge_wins == 1
+        assert all(timeout <= 5 for timeout in request.timeouts), (
+            'Таймаут запроса должен ограничиваться бюджетом цикла'
+        )
+
+    def test_hedges_capped_by_ratio(self):
+        hedger = Hedger(ratio=0.5, delay=0.01)
+        request = SlowFirstRequest(slow=0.05)
+        for _ in range(4):
+            request.calls = 0
+            hedger.call(request, Deadline(5))
+        hedger.shutdown()
+        assert hedger.requests == 4
+        assert hedger.hedges == 2, (
+            'Число хеджей не должно превышать долю ratio от запросов'
+        )
+
+    def test_deadline_exceeded(self):
+        hedger = Hedger(ratio=1.0, delay=0.01)
+        with pytest.raises(DeadlineExceededError):
+            hedger.call(lambda timeout: time.sleep(1), Deadline(0.1))
+        hedger.shutdown()
+
+    def test_p95_delay(self):
+        hedger = Hedger(ratio=0.1, min_samples=10)
+        assert hedger.hedge_delay() is None
+        hedger.latencies.extend(i / 100 for i in range(1, 101))
+        assert hedger.hedge_delay() == pytest.approx(0.95)
+        hedger.latencies.clear()
+        hedger.latencies.extend(i / 100 for i in range(1, 21))
+        assert hedger.hedge_delay() == pytest.approx(0.19)
+        hedger.shutdown()
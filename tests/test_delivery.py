@@ -0,0 +1,120 @@
+import time
+
+from utils import MockResponse, RecordingBot, mock_api
+
+import homework
+import notifiers
+from config import Config, TenantConfig
+from delivery import FanOut
+from notifiers import Dispatcher, TelegramNotifier
+
+
+class TestFanOut:
+
+    def test_slow_subscriber_does_not_hold_back_others(self):
+        fan_out = FanOut(workers=4)
+        bot = RecordingBot(slow_chat='slow', broken_chat='broken')
+        targets = ['1', 'slow', 'broken', '2']
+        started = time.monotonic()
+        rounds = [
+            dict(zip(targets, fan_out.deliver(
+                targets,
+                lambda chat_id: bot.send_message(chat_id=chat_id, text='hi')
+            )))
+            for _ in range(3)
+        ]
+        outcomes = {
+            target: [futures[target].result(1).ok for futures in rounds]
+            for target in ('1', 'broken', '2')
+        }
+        assert time.monotonic() - started < 1, (
+            'Зависший чат не должен задерживать доставку в другие чаты'
+        )
+        assert outcomes == {
+            '1': [True] * 3, 'broken': [False] * 3, '2': [True] * 3
+        }, 'Итоги доставки должны сообщаться по каждому подписчику'
+        assert not rounds[0]['slow'].done()
+        bot.release.set()
+        assert rounds[2]['slow'].result(5).ok
+        fan_out.shutdown()
+
+    def test_messages_to_one_target_keep_order(self):
+        fan_out = FanOut(workers=4)
+        sent = []
+        futures = [
+            fan_out.enqueue('1', sent.append, index) for index in range(50)
+        ]
+        for future in futures:
+            future.result(5)
+        fan_out.shutdown()
+        assert sent == list(range(50)), (
+            'Сообщения одному адресату должны уходить по порядку'
+        )
+
+    def test_deliver_to_tenant_subscribers(self):
+        dispatcher = Dispatcher(workers=2)
+        bot = RecordingBot()
+        tenant = homework.Tenant(TenantConfig('a', 'p', 't', '1'), bot, 0)
+        tenant.notifiers = [
+            TelegramNotifier(bot, chat_id) for chat_id in ('1', '2', '3')
+        ]
+        futures = homework.deliver(dispatcher, tenant, 'hi')
+        results = [future.result(5) for future in futures]
+        dispatcher.shutdown()
+        assert all(result.ok for result in results)
+        assert sorted(bot.sent) == ['1', '2', '3']
+
+
+class HangingBot:
+
+    def __init__(self, token=None):
+        self.sent = []
+        self.attempts = []
+
+    def send_message(self, chat_id=None, text=None, timeout=None, **kwargs):
+        if chat_id == 'slow':
+            self.attempts.append(text)
+            time.sleep(timeout)
+            raise TimeoutError('chat hangs')
+        self.sent.append((chat_id, text))
+
+
+class TestWorkerDelivery:
+
+    def test_budget_does_not_drop_messages(self, monkeypatch,
+                                           make_worker):
+        answers = iter([
+            [{'homework_name': f'hw{index}', 'status': 'approved'}
+             for index in range(3)],
+            [],
+        ])
+        mock_api(monkeypatch, MockResponse(
+            lambda: {'homeworks': next(answers), 'current_date': 999}
+        ))
+        monkeypatch.setattr(homework, 'CYCLE_BUDGET', 1)
+        monkeypatch.setitem(notifiers.NOTIFIER_TIMEOUTS, 'telegram', 0.5)
+        config = Config(
+            retry_time=600,
+            homework_statuses=dict(homework.HOMEWORK_STATUSES),
+            tenants=(TenantConfig('a', 'p', 't', '1'),),
+            subscriptions={'a': ('slow',)},
+        )
+        worker = make_worker(config, bot_factory=HangingBot)
+        tenant = worker.tenants['a']
+        worker.poll(tenant)
+        assert worker.dispatcher.drain(5)
+
+        assert len(tenant.bot.sent) == 3, (
+            'Зависший чат не должен отнимать сообщения у других чатов'
+        )
+        assert tenant.current_timestamp == 999
+        assert [
+            (target.key, message) for target, message in tenant.retry
+        ] == [('чат slow', homework.parse_status(
+            {'homework_name': 'hw2', 'status': 'approved'}
+        ))], 'Доставка, прерванная бюджетом, должна повторяться'
+
+        worker.poll(tenant)
+        assert worker.dispatcher.drain(5)
+        assert len(tenant.bot.attempts) == 3 and not tenant.retry
+        assert len(tenant.bot.sent) == 3, 'Повтор только для чата slow'
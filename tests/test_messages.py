@@ -0,0 +1,105 @@
+import pytest
+
+import benchmark
+import homework
+from exceptions import UnknownHomeworkStatusError
+from messages import VERDICTS, MessageRenderer
+
+
+class TestParseStatuses:
+
+    def test_matches_parse_status(self):
+        records = [
+            {'homework_name': f'hw{index}', 'status': status}
+            for index, status in enumerate(homework.HOMEWORK_STATUSES)
+        ]
+        messages, errors = homework.parse_statuses(records)
+        assert errors == []
+        assert messages == [
+            homework.parse_status(record) for record in records
+        ], 'Пакетный вариант должен совпадать с parse_status'
+
+    def test_errors_reported_per_item(self):
+        records = [
+            {'homework_name': 'ok', 'status': 'approved'},
+            {'status': 'approved'},
+            {'homework_name': 'hw'},
+            {'homework_name': 'hw', 'status': 'unknown'},
+            {'homework_name': 'hw', 'status': ['approved']},
+            'hw',
+        ]
+        messages, errors = homework.parse_statuses(records)
+        assert messages[0] is not None and messages[1:] == [None] * 5
+        assert [
+            (index, type(error)) for index, error in errors
+        ] == [
+            (1, KeyError), (2, KeyError), (3, UnknownHomeworkStatusError),
+            (4, UnknownHomeworkStatusError), (5, TypeError),
+        ], 'Ошибки должны возвращаться по каждой записи'
+
+    def test_templates_cached_by_status_and_locale(self):
+        renderer = MessageRenderer({'approved': 'Принята'})
+        record = {'homework_name': 'hw', 'status': 'approved'}
+        ru, _ = renderer.render([record, record])
+        en, _ = renderer.render([record], 'en')
+        assert ru == ['Изменился статус проверки работы "hw". Принята'] * 2
+        assert en[0].startswith('Review status of homework "hw" changed.')
+        assert set(renderer.cache) == {'ru', 'en'}
+        assert set(renderer.cache['ru']) == {'approved'}
+
+    def test_cache_reset_on_new_statuses(self, monkeypatch):
+        record = {'homework_name': 'hw', 'status': 'approved'}
+        homework.parse_statuses([record])
+        monkeypatch.setattr(
+            homework, 'HOMEWORK_STATUSES', {'approved': 'Новый вердикт'}
+        )
+        messages, _ = homework.parse_statuses([record])
+        assert messages[0].endswith('Новый вердикт'), (
+            'После замены словаря статусов шаблоны собираются заново'
+        )
+
+    def test_config_verdicts_take_priority(self):
+        renderer = MessageRenderer(
+            {'approved': 'Принята', 'rejected': 'Отклонена'},
+            verdicts={'en': {'approved': 'Accepted'}}
+        )
+        records = [
+            {'homework_name': 'hw', 'status': 'approved'},
+            {'homework_name': 'hw', 'status': 'rejected'},
+        ]
+        messages, _ = renderer.render(records, 'en')
+        assert messages[0].endswith('Accepted'), (
+            'Вердикты из конфигурации важнее встроенных'
+        )
+        assert messages[1].endswith(VERDICTS['en']['rejected'])
+        messages, _ = renderer.render(records)
+        assert messages[0].endswith('Принята')
+
+    def test_config_verdicts_reloaded(self, monkeypatch):
+        record = {'homework_name': 'hw', 'status': 'approved'}
+        homework.parse_statuses([record], 'en')
+        monkeypatch.setattr(
+            homework, 'LOCALE_VERDICTS', {'en': {'approved': 'Accepted'}}
+        )
+        messages, _ = homework.parse_statuses([record], 'en')
+        assert messages[0].endswith('Accepted'), (
+            'После замены вердиктов шаблоны собираются заново'
+        )
+
+    def test_unknown_locale_reported_per_item(self):
+        renderer = MessageRenderer({'approved': 'Принята'})
+        record = {'homework_name': 'hw', 'status': 'approved'}
+        messages, errors = renderer.render([record, record], 'xx')
+        assert messages == [None, None]
+        assert [
+            (index, type(error)) for index, error in errors
+        ] == [(0, KeyError), (1, KeyError)], (
+            'Неизвестная локаль - ошибка по каждой записи, а не исключение'
+        )
+        assert 'xx' not in renderer.cache
+
+    @pytest.mark.parametrize('invalid_share', [0, 0.2])
+    def test_benchmark(self, invalid_share):
+        result = benchmark.benchmark(1000, invalid_share, repeat=1)
+        assert result.matches, result.report()
+        assert (result.errors > 0) == (invalid_share > 0)
@@ -0,0 +1,193 @@
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config import Config, TenantConfig, load_config
+from exceptions import ConfigError
+from notifiers import (Dispatcher, SMTPNotifier, TelegramNotifier,
+                       WebhookNotifier)
+
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    delay = 0
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        time.sleep(self.delay)
+        self.reply('220 stand-in')
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == 'QUIT':
+                self.reply('221 bye')
+                return
+            if command == 'DATA':
+                self.reply('354 go on')
+                data = []
+                while True:
+                    line = self.rfile.readline().decode()
+                    if line.rstrip('\r\n') == '.':
+                        break
+                    data.append(line)
+                self.server.messages.append(''.join(data))
+            self.reply('250 ok')
+
+
+@pytest.fixture
+def smtp_server():
+    servers = []
+
+    def start(delay=0):
+        handler = type('Handler', (StandInSMTPHandler,), {'delay': delay})
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        server.messages = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def webhook_server():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers['Content-Length'])
+            received.append(json.loads(self.rfile.read(length)))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.received = received
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class StandInBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text, time.monotonic()))
+
+
+class TestNotifiers:
+
+    def test_webhook(self, webhook_server):
+        host, port = webhook_server.server_address[:2]
+        WebhookNotifier(f'http://{host}:{port}/hook').send('Ура!')
+        assert webhook_server.received == [{'text': 'Ура!'}]
+
+    def test_slow_smtp_does_not_delay_later_messages(self, smtp_server):
+        slow = smtp_server(delay=1)
+        host, port = slow.server_address[:2]
+        bot = StandInBot()
+        dispatcher = Dispatcher(workers=2)
+        notifiers = [
+            SMTPNotifier(host, 'bot@example.com', ['s@example.com'],
+                         port=port, timeout=2),
+            TelegramNotifier(bot, '1'),
+        ]
+        started = time.monotonic()
+        results = []
+        for index in range(3):
+            dispatcher.dispatch(notifiers, f'hw{index}', done=results.append)
+        dispatched = time.monotonic() - started
+        while len(bot.sent) < 3 and time.monotonic() - started < 1:
+            time.sleep(0.01)
+        assert dispatched < 0.1, 'dispatch() не должен ждать отправки'
+        assert sorted(text for _, text, _ in bot.sent) == ['hw0', 'hw1', 'hw2']
+        assert bot.sent[-1][2] - started < 0.5, (
+            'Медленный SMTP-сервер не должен задерживать следующие '
+            'сообщения в Telegram'
+        )
+        assert dispatcher.drain(10)
+        assert len(results) == 6
+        dispatcher.shutdown()
+
+    def test_smtp(self, smtp_server):
+        server = smtp_server()
+        host, port = server.server_address[:2]
+        notifier = SMTPNotifier(
+            host, 'bot@example.com', ['student@example.com'], port=port
+        )
+        notifier.send('Работа проверена')
+        assert len(server.messages) == 1
+        assert 'student@example.com' in server.messages[0]
+
+    def test_slow_smtp_does_not_delay_telegram(self, smtp_server,
+                                               webhook_server):
+        slow = smtp_server(delay=1)
+        host, port = slow.server_address[:2]
+        hook_host, hook_port = webhook_server.server_address[:2]
+        bot = StandInBot()
+        dispatcher = Dispatcher(workers=2)
+        notifiers = [
+            SMTPNotifier(host, 'bot@example.com', ['s@example.com'],
+                         port=port, timeout=0.3),
+            TelegramNotifier(bot, '1'),
+            WebhookNotifier(f'http://{hook_host}:{hook_port}/hook'),
+        ]
+        started = time.monotonic()
+        futures = dispatcher.dispatch(notifiers, 'Ура!')
+        results = [future.result(5) for future in futures]
+        dispatcher.shutdown()
+
+        assert [result.ok for result in results] == [False, True, True], (
+            'Итоги должны сообщаться по каждому каналу'
+        )
+        assert bot.sent[0][2] - started < 0.25, (
+            'Медленный SMTP-сервер не должен задерживать доставку в Telegram'
+        )
+        assert webhook_server.received == [{'text': 'Ура!'}]
+
+
+class TestNotifiersConfig:
+
+    DEFAULTS = Config(
+        retry_time=600,
+        homework_statuses={'approved': 'Ура!'},
+        tenants=(TenantConfig('a', 'p', 't', '1'),),
+    )
+
+    def test_valid_notifiers(self, tmp_path):
+        path = tmp_path / 'config.json'
+        path.write_text(json.dumps({'notifiers': {'a': [
+            {'type': 'webhook', 'url': 'http://localhost/hook'},
+            {'type': 'smtp', 'host': 'localhost', 'sender': 'b@example.com',
+             'recipients': ['s@example.com'], 'timeout': 5},
+        ]}}), encoding='utf-8')
+        config = load_config(str(path), self.DEFAULTS)
+        assert len(config.notifiers['a']) == 2
+
+    @pytest.mark.parametrize('spec', [
+        {'type': 'pigeon'},
+        {'type': 'webhook'},
+        {'type': 'smtp', 'host': 'localhost', 'unknown': 1},
+        'webhook',
+    ])
+    def test_invalid_notifier(self, tmp_path, spec):
+        path = tmp_path / 'config.json'
+        path.write_text(
+            json.dumps({'notifiers': {'a': [spec]}}), encoding='utf-8'
+        )
+        with pytest.raises(ConfigError):
+            load_config(str(path), self.DEFAULTS)
@@ -0,0 +1,54 @@
+import cProfile
+import os
+
+import homework
+from profiling import CycleProfiler
+
+
+class TestCycleProfiler:
+
+    def test_profiles_armed_cycles(self, tmp_path):
+        profiler = CycleProfiler(str(tmp_path), cycles=2)
+        profiler.start_cycle()
+        assert not profiler.active, (
+            'Профилирование не должно начинаться без запроса'
+        )
+        assert profiler.end_cycle() == []
+
+        profiler.arm()
+        reports = []
+        for _ in range(3):
+            profiler.start_cycle()
+            sum(range(1000))
+            reports.append(profiler.end_cycle())
+        assert reports[0] == [] and reports[2] == [], (
+            'Отчёты должны сохраняться только после последнего цикла сессии'
+        )
+        assert len(reports[1]) == 3
+        for path in reports[1]:
+            assert os.path.getsize(path) > 0
+        assert not profiler.active
+
+    def test_arm_ignored_during_session(self, tmp_path):
+        profiler = CycleProfiler(str(tmp_path), cycles=2)
+        profiler.arm()
+        profiler.start_cycle()
+        profiler.end_cycle()
+        profiler.arm(5)
+        assert profiler.remaining == 1
+        profiler.start_cycle()
+        assert profiler.end_cycle()
+
+    def test_failed_start_cancels_session(self, tmp_path, monkeypatch):
+        class BusyProfile(cProfile.Profile):
+            def enable(self, *args, **kwargs):
+                raise ValueError('Another profiling tool is already active')
+
+        monkeypatch.setattr(cProfile, 'Profile', BusyProfile)
+        profiler = CycleProfiler(str(tmp_path), cycles=2)
+        profiler.arm()
+        homework.start_profiling(profiler)
+        assert not profiler.active and not profiler.remaining, (
+            'Ошибка запуска профилирования не должна прерывать опрос'
+        )
+        homework.finish_profiling(profiler)
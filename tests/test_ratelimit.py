@@ -0,0 +1,109 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from utils import FakeClock, MockResponse, mock_api
+
+import homework
+from exceptions import ThrottledAPIError
+from metrics import metrics
+from ratelimit import RateLimiter, parse_retry_after
+
+
+class TestRetryAfter:
+
+    def test_seconds(self):
+        assert parse_retry_after('120') == 120
+
+    def test_http_date(self):
+        assert parse_retry_after(
+            'Thu, 01 Jan 1970 00:02:00 GMT', now=60
+        ) == 60
+
+    @pytest.mark.parametrize('value', [None, '', 'soon'])
+    def test_default(self, value):
+        assert parse_retry_after(value, default=7) == 7
+
+
+class TestRateLimiter:
+
+    def test_token_bucket_paces_requests(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=2, burst=2, monotonic=clock.monotonic,
+                              sleep=clock.sleep)
+        for _ in range(4):
+            with limiter.acquire(timeout=10):
+                pass
+        assert clock.now == pytest.approx(1.0), (
+            'После исчерпания burst запросы должны идти не чаще rate в секунду'
+        )
+
+    def test_rejects_when_wait_exceeds_timeout(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=1, burst=1, monotonic=clock.monotonic,
+                              sleep=clock.sleep)
+        with limiter.acquire(timeout=10):
+            pass
+        before = metrics.get('api_rate_limited_total')
+        with pytest.raises(ThrottledAPIError):
+            with limiter.acquire(timeout=0.5):
+                pass
+        assert metrics.get('api_rate_limited_total') == before + 1
+
+    def test_waits_without_timeout(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=0.01, burst=1, monotonic=clock.monotonic,
+                              sleep=clock.sleep)
+        for _ in range(2):
+            with limiter.acquire(None):
+                pass
+        assert clock.now == pytest.approx(100), (
+            'Без timeout запрос ждёт разрешения сколько потребуется'
+        )
+
+    def test_retry_after_blocks_all_requests(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=100, burst=100, monotonic=clock.monotonic,
+                              sleep=clock.sleep)
+        before = metrics.get('api_throttled_total')
+        with pytest.raises(ThrottledAPIError):
+            with limiter.acquire(timeout=1):
+                raise ThrottledAPIError('429', retry_after=30)
+        assert metrics.get('api_throttled_total') == before + 1
+        with pytest.raises(ThrottledAPIError):
+            with limiter.acquire(timeout=1):
+                pass
+        with limiter.acquire(timeout=60):
+            pass
+        assert clock.now >= 30
+
+    def test_in_flight_cap(self):
+        limiter = RateLimiter(rate=100, burst=100, max_in_flight=1)
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with limiter.acquire(timeout=1):
+                entered.set()
+                release.wait(2)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        entered.wait(1)
+        with pytest.raises(ThrottledAPIError):
+            with limiter.acquire(timeout=0.05):
+                pass
+        release.set()
+        thread.join()
+
+
+class TestThrottledAnswer:
+
+    def test_429_raises_throttled(self, monkeypatch):
+        mock_api(monkeypatch, MockResponse(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            headers={'Retry-After': '120'}
+        ))
+        with pytest.raises(ThrottledAPIError) as error:
+            homework.get_api_answer(1)
+        assert error.value.retry_after == 120
@@ -0,0 +1,86 @@
+import time
+from collections import Counter
+
+import pytest
+
+from scheduler import PollScheduler, TimingWheel, next_run, phase
+
+
+class TestTimingWheel:
+
+    def test_fires_in_order_once(self):
+        wheel = TimingWheel(start=0)
+        for when in (5000, 3, 70, 64, 0.5, 4095, 4096):
+            wheel.schedule(when, when)
+        fired = []
+        for now in range(0, 5001):
+            fired.extend(timer.payload for timer in wheel.advance(now))
+        assert fired == [0.5, 3, 64, 70, 4095, 4096, 5000]
+        assert len(wheel) == 0
+
+    def test_does_not_fire_early(self):
+        wheel = TimingWheel(start=0)
+        wheel.schedule(600, 'a')
+        assert wheel.advance(599.9) == []
+        assert [timer.payload for timer in wheel.advance(600)] == ['a']
+
+    def test_cancel(self):
+        wheel = TimingWheel(start=0)
+        timer = wheel.schedule(100, 'a')
+        wheel.schedule(100, 'b')
+        assert wheel.cancel(timer)
+        assert not wheel.cancel(timer)
+        assert [timer.payload for timer in wheel.advance(100)] == ['b']
+
+    def test_next_wakeup(self):
+        wheel = TimingWheel(start=10)
+        assert wheel.next_wakeup() is None
+        wheel.schedule(20, 'a')
+        assert wheel.next_wakeup() == 20
+        wheel.schedule(1000, 'b')
+        wheel.advance(20)
+        assert 20 < wheel.next_wakeup() <= 1000
+
+
+class TestPollScheduler:
+
+    def test_phase_is_deterministic_and_in_range(self):
+        assert phase('tenant', 600) == phase('tenant', 600)
+        assert 0 <= phase('tenant', 600) < 600
+        assert phase('tenant', 600) != phase('other', 600)
+
+    def test_next_run(self):
+        assert next_run(0, 10, 600, 5) == 10
+        assert next_run(0, 10, 600, 11) == 610
+
+    def test_no_drift(self):
+        scheduler = PollScheduler(start=0, interval=600)
+        scheduler.add('a', now=0)
+        first = scheduler.when('a')
+        runs = []
+        now = 0
+        while len(runs) < 5:
+            now = scheduler.next_wakeup() + 0.7
+            if scheduler.due(now):
+                runs.append(now)
+        assert scheduler.when('a') == pytest.approx(first + 5 * 600), (
+            'Опоздание опроса не должно сдвигать расписание'
+        )
+
+    def test_100k_tenants_spread_evenly(self):
+        scheduler = PollScheduler(start=0, interval=600)
+        for number in range(100000):
+            scheduler.add(f'tenant-{number}', now=0)
+        per_second = Counter()
+        started = time.perf_counter()
+        for now in range(1, 1201):
+            per_second[now % 600] += len(scheduler.due(now))
+        elapsed = time.perf_counter() - started
+        assert sum(per_second.values()) == 200000, (
+            'Каждый получатель должен опрашиваться раз в период'
+        )
+        mean = 200000 / 600
+        assert max(per_second.values()) < 1.5 * mean, (
+            'Опросы должны быть равномерно распределены по периоду'
+        )
+        assert elapsed < 20
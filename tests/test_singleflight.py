@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+from utils import FakeClock, MockResponse, RecordingBot, mock_api
+
+import homework
+from config import Config, TenantConfig
+from singleflight import SingleFlight
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_one_request(self):
+        flight = SingleFlight(ttl=0)
+        calls = []
+        release = threading.Event()
+
+        def request():
+            calls.append(1)
+            release.wait(2)
+            return {'homeworks': []}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(flight.do('token', request))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1, 'Одинаковые запросы должны объединяться'
+        assert len(results) == 5
+        assert all(result is results[0] for result in results)
+        assert flight.executed == 1 and flight.deduplicated == 4
+
+    def test_ttl_cache(self):
+        clock = FakeClock()
+        flight = SingleFlight(ttl=5, monotonic=clock.monotonic)
+        calls = []
+        flight.do('key', lambda: calls.append(1))
+        clock.now = 4
+        flight.do('key', lambda: calls.append(1))
+        assert len(calls) == 1
+        clock.now = 6
+        flight.do('key', lambda: calls.append(1))
+        assert len(calls) == 2
+
+    def test_errors_not_cached(self):
+        flight = SingleFlight(ttl=5)
+
+        def broken():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            flight.do('key', broken)
+        assert flight.do('key', lambda: 'ok') == 'ok'
+
+
+class TestWorkerCoalescing:
+
+    @pytest.fixture(autouse=True)
+    def restore_globals(self, monkeypatch):
+        monkeypatch.setattr(homework, 'RETRY_TIME', homework.RETRY_TIME)
+        monkeypatch.setattr(
+            homework, 'HOMEWORK_STATUSES', homework.HOMEWORK_STATUSES
+        )
+
+    @pytest.mark.parametrize('ttl', [homework.COALESCE_TTL, 0])
+    def test_tenants_sharing_token_make_one_request(self, monkeypatch, ttl,
+                                                    make_worker):
+        calls = mock_api(monkeypatch, MockResponse({
+            'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+            'current_date': 100,
+        }))
+        config = Config(
+            retry_time=600,
+            homework_statuses=dict(homework.HOMEWORK_STATUSES),
+            tenants=(
+                TenantConfig('a', 'shared', 't1', '1'),
+                TenantConfig('b', 'shared', 't2', '2'),
+                TenantConfig('c', 'own', 't3', '3'),
+            ),
+        )
+        worker = make_worker(config, bot_factory=RecordingBot)
+        worker.single_flight = SingleFlight(ttl)
+        a, b, c = worker.tenants.values()
+        assert worker.scheduler.when('a') == worker.scheduler.when('b'), (
+            'Получатели с общим токеном должны опрашиваться одновременно'
+        )
+        worker.cycle([a, b, c])
+        assert worker.dispatcher.drain(5)
+
+        requests_made = [call['headers']['Authorization'] for call in calls]
+        assert sorted(requests_made) == ['OAuth own', 'OAuth shared'], (
+            'Группа с общим токеном опрашивается одним запросом и без кэша'
+        )
+        assert a.bot.sent == ['1'] and b.bot.sent == ['2']
+        assert a.current_timestamp == b.current_timestamp == 100
+        assert worker.single_flight.deduplicated == 1
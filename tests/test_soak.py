@@ -0,0 +1,42 @@
+import homework
+import soak
+
+
+class TestSoak:
+
+    def test_virtual_clock(self):
+        clock = soak.VirtualClock(start=1000)
+        clock.sleep(600)
+        assert clock.time() == 1600
+        assert clock.monotonic() == 600
+
+    def test_short_soak_runs_real_loop(self):
+        endpoint = homework.ENDPOINT
+        handlers = list(homework.logger.handlers)
+        budget = soak.SoakBudget(
+            rss_growth_mb=256, traced_growth_kb=10 ** 6,
+            objects_growth=10 ** 6, latency_growth=100, latency_p99_ms=10 ** 4
+        )
+        result = soak.soak(120, budget, warmup=20, sample_every=20)
+        assert result.ok, result.report()
+        assert len(result.latencies) == 120
+        assert (
+            119 * homework.RETRY_TIME <= result.virtual_seconds
+            <= 121 * homework.RETRY_TIME
+        ), 'Получатель должен опрашиваться раз в RETRY_TIME'
+        assert len(result.samples) >= 2
+        assert homework.ENDPOINT == endpoint, (
+            'После прогона должен восстанавливаться адрес эндпоинта'
+        )
+        assert homework.logger.handlers == handlers
+
+    def test_budget_violation_reported(self):
+        result = soak.SoakResult(cycles=4, virtual_seconds=2400)
+        result.latencies = [0.001, 0.001, 0.5, 0.5]
+        result.samples = [
+            soak.SoakSample(cycle=1, rss=0, traced=0, objects=0),
+            soak.SoakSample(cycle=4, rss=2 ** 30, traced=0, objects=0),
+        ]
+        soak.check_budget(result, soak.SoakBudget(), warmup=0)
+        assert not result.ok
+        assert len(result.failures) == 3
@@ -0,0 +1,257 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import BadRequest
+from utils import FakeClock, MockResponse, mock_api
+
+import homework
+from config import Config, TenantConfig
+from statusboard import BoardStore, StatusBoard
+
+
+class BoardBot:
+
+    def __init__(self, token=None):
+        self.sent = []
+        self.pinned = []
+        self.edits = []
+        self.edit_error = None
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+        return SimpleNamespace(message_id=len(self.sent))
+
+    def pin_chat_message(self, chat_id=None, message_id=None, **kwargs):
+        self.pinned.append((chat_id, message_id))
+
+    def edit_message_text(self, text, chat_id=None, message_id=None,
+                          **kwargs):
+        if self.edit_error is not None:
+            raise self.edit_error
+        self.edits.append((chat_id, message_id, text))
+
+
+class TestStatusBoard:
+
+    def test_first_flush_posts_and_pins(self):
+        bot = BoardBot()
+        board = StatusBoard(bot, '1', debounce=0)
+        board.update('hw', 'На проверке')
+        assert board.flush()
+        assert bot.pinned == [('1', 1)], (
+            'Первое сообщение доски должно закрепляться'
+        )
+        assert '"hw": На проверке' in bot.sent[0][1]
+
+    def test_identical_edit_is_skipped(self):
+        bot = BoardBot()
+        board = StatusBoard(bot, '1', debounce=0)
+        board.update('hw', 'На проверке')
+        board.flush()
+        board.update('hw', 'На проверке')
+        assert not board.flush()
+        board.update('hw', 'Принята')
+        board.update('hw', 'На проверке')
+        assert not board.flush(), 'Совпадающий текст не должен отправляться'
+        assert bot.edits == []
+
+    def test_rapid_changes_are_debounced(self):
+        clock = FakeClock()
+        bot = BoardBot()
+        board = StatusBoard(bot, '1', debounce=30, monotonic=clock.monotonic)
+        board.update('hw', 'На проверке')
+        board.flush()
+        board.update('hw', 'Замечания')
+        assert not board.flush()
+        board.update('hw', 'Принята')
+        assert not board.flush()
+        clock.sleep(30)
+        assert board.flush()
+        assert len(bot.edits) == 1, 'Правки в окне debounce объединяются'
+        assert bot.edits[0][2].endswith('"hw": Принята')
+
+    def test_not_modified_error_is_ignored(self):
+        bot = BoardBot()
+        board = StatusBoard(bot, '1', debounce=0)
+        board.update('hw', 'На проверке')
+        board.flush()
+        bot.edit_error = BadRequest('Message is not modified')
+        board.update('hw', 'Принята')
+        assert board.flush()
+        assert board.message_id == 1
+
+    def test_deleted_message_is_posted_again(self):
+        bot = BoardBot()
+        board = StatusBoard(bot, '1', debounce=0)
+        board.update('hw', 'На проверке')
+        board.flush()
+        bot.edit_error = BadRequest('Message to edit not found')
+        board.update('hw', 'Принята')
+        with pytest.raises(BadRequest):
+            board.flush()
+        bot.edit_error = None
+        assert board.flush()
+        assert len(bot.sent) == 2 and bot.pinned[-1] == ('1', 2), (
+            'Удалённое сообщение доски должно отправляться заново'
+        )
+
+    def test_failed_pin_is_retried(self):
+        bot = BoardBot()
+        board = StatusBoard(bot, '1', debounce=0)
+
+        def broken_pin(**kwargs):
+            raise BadRequest('Not enough rights to pin a message')
+
+        bot.pin_chat_message = broken_pin
+        board.update('hw', 'На проверке')
+        with pytest.raises(BadRequest):
+            board.flush()
+        del bot.pin_chat_message
+        assert board.pending
+        assert board.flush()
+        assert bot.pinned == [('1', 1)] and len(bot.sent) == 1, (
+            'Незакреплённое сообщение закрепляется при следующем flush'
+        )
+        assert not board.pending
+
+    def test_restored_board_is_edited(self, tmp_path):
+        board = StatusBoard(BoardBot(), '1', debounce=0)
+        board.update('hw', 'На проверке')
+        board.flush()
+        store = BoardStore(str(tmp_path / 'boards.json'))
+        store.save({'a': {'1': board.state()}})
+
+        bot = BoardBot()
+        restored = StatusBoard(bot, '1', debounce=0)
+        restored.restore(store.load()['a']['1'])
+        restored.update('hw', 'На проверке')
+        assert not restored.flush()
+        restored.update('hw', 'Принята')
+        assert restored.flush()
+        assert bot.sent == [] and bot.pinned == [], (
+            'Восстановленное сообщение редактируется, а не отправляется'
+        )
+        assert bot.edits[0][1] == 1
+
+
+class TestWorkerStatusBoard:
+
+    @pytest.fixture(autouse=True)
+    def use_workers(self, make_worker):
+        self.make_worker = make_worker
+
+    def worker(self, monkeypatch, statuses, bot_factory=BoardBot,
+               subscriptions=None, **options):
+        answers = iter(statuses)
+        mock_api(monkeypatch, MockResponse(lambda: {
+            'homeworks': [{'homework_name': 'hw', 'status': next(answers)}],
+            'current_date': 100,
+        }))
+        config = Config(
+            retry_time=600,
+            homework_statuses=dict(homework.HOMEWORK_STATUSES),
+            tenants=(TenantConfig('a', 'p', 't', '1', **options),),
+            subscriptions=subscriptions or {},
+        )
+        return self.make_worker(
+            config, bot_factory=bot_factory, clock=FakeClock()
+        )
+
+    def test_board_replaces_messages(self, monkeypatch):
+        worker = self.worker(
+            monkeypatch, ['reviewing', 'approved'], status_board=True
+        )
+        tenant = worker.tenants['a']
+        worker.poll(tenant)
+        worker.clock.sleep(600)
+        worker.poll(tenant)
+        assert worker.dispatcher.drain(5)
+
+        assert len(tenant.bot.sent) == 1, 'Без board_final_messages ' \
+            'новые сообщения не отправляются'
+        assert len(tenant.bot.edits) == 1
+        assert tenant.bot.edits[0][2].endswith(
+            homework.HOMEWORK_STATUSES['approved']
+        )
+
+    def test_final_verdict_sent_as_message(self, monkeypatch):
+        worker = self.worker(
+            monkeypatch, ['reviewing', 'approved'],
+            status_board=True, board_final_messages=True
+        )
+        tenant = worker.tenants['a']
+        worker.poll(tenant)
+        worker.clock.sleep(600)
+        worker.poll(tenant)
+        assert worker.dispatcher.drain(5)
+
+        messages = [text for _, text in tenant.bot.sent]
+        assert len(messages) == 2
+        assert messages[1] == homework.parse_status(
+            {'homework_name': 'hw', 'status': 'approved'}
+        ), 'О финальном вердикте должно приходить отдельное сообщение'
+
+    def test_hung_chat_does_not_hold_back_boards(self, monkeypatch):
+        release = threading.Event()
+
+        class HangingBot(BoardBot):
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                if chat_id == '1':
+                    release.wait(5)
+                return super().send_message(chat_id, text, **kwargs)
+
+        worker = self.worker(
+            monkeypatch, ['reviewing'], bot_factory=HangingBot,
+            subscriptions={'a': ('2',)}, status_board=True
+        )
+        tenant = worker.tenants['a']
+        started = time.monotonic()
+        worker.poll(tenant)
+        assert time.monotonic() - started < 1, (
+            'Опрос не ждёт обновления закреплённых сообщений'
+        )
+        try:
+            for _ in range(100):
+                if tenant.bot.pinned:
+                    break
+                time.sleep(0.01)
+            assert tenant.bot.pinned == [('2', 1)], (
+                'Зависший чат не задерживает доску в другом чате'
+            )
+        finally:
+            release.set()
+        assert worker.dispatcher.drain(5)
+
+    def test_board_survives_restart(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(
+            homework, 'BOARD_STATE_FILE', str(tmp_path / 'boards.json')
+        )
+        worker = self.worker(monkeypatch, ['reviewing'], status_board=True)
+        worker.poll(worker.tenants['a'])
+        assert worker.dispatcher.drain(5)
+        worker = self.worker(monkeypatch, ['approved'], status_board=True)
+        tenant = worker.tenants['a']
+        worker.poll(tenant)
+        assert worker.dispatcher.drain(5)
+
+        assert tenant.bot.sent == [] and tenant.bot.pinned == [], (
+            'После перезапуска доска не должна отправляться заново'
+        )
+        assert tenant.bot.edits[0][1] == 1
+        assert tenant.bot.edits[0][2].endswith(
+            homework.HOMEWORK_STATUSES['approved']
+        )
+
+    def test_board_survives_reload(self, monkeypatch):
+        worker = self.worker(monkeypatch, ['reviewing'], status_board=True)
+        worker.poll(worker.tenants['a'])
+        board = worker.tenants['a'].boards['1']
+        worker.apply(Config(
+            retry_time=300,
+            homework_statuses=dict(homework.HOMEWORK_STATUSES),
+            tenants=(TenantConfig('a', 'p2', 't', '1', status_board=True),),
+        ))
+        assert worker.tenants['a'].boards['1'] is board
+        assert worker.dispatcher.drain(5)
@@ -1,6 +1,11 @@
+import threading
+import time
+from http import HTTPStatus
 from inspect import signature
 from types import ModuleType
 
+import requests
+
 
 def check_function(scope: ModuleType, func_name: str, params_qty: int = 0):
     """Checks if scope has a function with specific name and params with qty"""
@@ -37,3 +42,66 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
         f'{var_name} должна быть переменной, а не функцией.'
     )
 
+
+class FakeClock:
+    """Virtual clock: sleep() moves time forward instantly"""
+
+    def __init__(self, start: float = None):
+        self.start = time.time() if start is None else start
+        self.now = 0.0
+
+    def time(self):
+        return self.start + self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RecordingBot:
+    """Telegram bot stand-in that records chats it sent messages to"""
+
+    def __init__(self, token=None, slow_chat=None, broken_chat=None):
+        self.slow_chat = slow_chat
+        self.broken_chat = broken_chat
+        self.sent = []
+        self.release = threading.Event()
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if chat_id == self.broken_chat:
+            raise RuntimeError('chat not found')
+        if chat_id == self.slow_chat:
+            self.release.wait(5)
+        self.sent.append(chat_id)
+
+
+class MockResponse:
+    """requests.Response stand-in; payload may be a callable"""
+
+    def __init__(self, payload=None, status_code=HTTPStatus.OK,
+                 headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        if callable(self.payload):
+            return self.payload()
+        return self.payload
+
+
+def mock_api(monkeypatch, response: MockResponse) -> list:
+    """
+    Replaces requests.get with a stub answering with response.
+    :return: list of kwargs of every request made
+    """
+    calls = []
+
+    def mock_get(*args, **kwargs):
+        calls.append(kwargs)
+        return response
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    return calls